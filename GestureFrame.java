@@ -0,0 +1,108 @@
+package org.example;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+// wire_format.py 의 바이너리 제스처 프레임 디코더 (레이아웃은 wire_format.py 참고)
+public class GestureFrame {
+    public static final int VERSION = 1;
+    public static final int HEADER_SIZE = 28;
+    public static final int LANDMARK_COUNT = 21 * 3;
+
+    public static final int FLAG_POSITION = 0x01;
+    public static final int FLAG_DIST = 0x02;
+    public static final int FLAG_LANDMARKS = 0x04;
+    public static final int FLAG_SOURCE = 0x08;
+    public static final int FLAG_PHASE = 0x10;
+    public static final int FLAG_PREDICTED = 0x20;
+    public static final int PREDICTED_SIZE = 8;
+
+    // wire_format.PHASES (0 = 단계 없는 프레임별 전송)
+    public static final int PHASE_NONE = 0;
+    public static final int PHASE_START = 1;
+    public static final int PHASE_UPDATE = 2;
+    public static final int PHASE_END = 3;
+
+    public static final int HAND_RIGHT = 0;
+    public static final int HAND_LEFT = 1;
+    public static final int HAND_NONE = 255;
+
+    // 순서 변경 금지 (wire_format.GESTURES 와 동일)
+    public static final String[] GESTURES = {
+            "none", "pointer", "pinch", "pinch_zoom", "left_pinch", "drag", "expansion_zoom", "rotate"
+    };
+
+    public int gesture;
+    public int action;
+    public int handId;
+    public int flags;
+    public int source;
+    public int phase;
+    public double timestamp;
+    public float x;
+    public float y;
+    public float dist;
+    public float px;
+    public float py;
+    public final float[] landmarks = new float[LANDMARK_COUNT];
+
+    public String gestureKey() {
+        return GESTURES[gesture];
+    }
+
+    public String actionName() {
+        return GESTURES[action];
+    }
+
+    // pinch 같은 단발성 제스처는 start 에서만 처리하면 된다
+    public boolean isStart() {
+        return (flags & FLAG_PHASE) == 0 || phase == PHASE_START;
+    }
+
+    public boolean isEnd() {
+        return (flags & FLAG_PHASE) != 0 && phase == PHASE_END;
+    }
+
+    public boolean hasPrediction() {
+        return (flags & FLAG_PREDICTED) != 0;
+    }
+
+    public boolean hasLandmarks() {
+        return (flags & FLAG_LANDMARKS) != 0;
+    }
+
+    // 새 객체를 만들지 않고 기존 프레임에 덮어쓴다
+    public GestureFrame decode(ByteBuffer buffer) {
+        ByteBuffer in = buffer.duplicate().order(ByteOrder.LITTLE_ENDIAN);
+        int start = in.position();
+
+        int version = in.get(start) & 0xFF;
+        if (version != VERSION) {
+            throw new IllegalArgumentException("unsupported wire format version " + version);
+        }
+        gesture = in.get(start + 1) & 0xFF;
+        action = in.get(start + 2) & 0xFF;
+        handId = in.get(start + 3) & 0xFF;
+        flags = in.get(start + 4) & 0xFF;
+        source = in.get(start + 5) & 0xFF;
+        phase = (flags & FLAG_PHASE) != 0 ? in.get(start + 6) & 0xFF : PHASE_NONE;
+        timestamp = in.getDouble(start + 8);
+        x = in.getFloat(start + 16);
+        y = in.getFloat(start + 20);
+        dist = in.getFloat(start + 24);
+
+        int offset = start + HEADER_SIZE;
+        if (hasPrediction()) {
+            px = in.getFloat(offset);
+            py = in.getFloat(offset + 4);
+            offset += PREDICTED_SIZE;
+        }
+
+        if (hasLandmarks()) {
+            for (int i = 0; i < LANDMARK_COUNT; i++) {
+                landmarks[i] = in.getFloat(offset + i * 4);
+            }
+        }
+        return this;
+    }
+}
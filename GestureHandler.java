@@ -4,4 +4,12 @@ import org.json.JSONObject;
 
 public interface GestureHandler {
     void handle(JSONObject data);
+
+    // 바이너리 프레임 (GestureFrame) 처리. 필요한 핸들러만 구현
+    default void handle(GestureFrame frame) {
+    }
+
+    // 21개 랜드마크 스트림 (LandmarkStreamFrame) 처리
+    default void handle(LandmarkStreamFrame frame) {
+    }
 }
@@ -30,4 +30,18 @@ public class GestureRouter {
         }
 
     }
+
+    public void route(GestureFrame frame) {
+        GestureHandler handler = handlerMap.get(frame.gestureKey());
+        if(handler != null) {
+            handler.handle(frame);
+        }
+    }
+
+    public void route(LandmarkStreamFrame frame) {
+        GestureHandler handler = handlerMap.get("HAND_LANDMARKS");
+        if(handler != null) {
+            handler.handle(frame);
+        }
+    }
 }
@@ -51,4 +51,12 @@ public class LandmarkHandler implements GestureHandler {
             e.printStackTrace();
         }
     }
+
+    @Override
+    public void handle(LandmarkStreamFrame frame) {
+        if(listener == null || frame.handCount == 0) return;
+        // JSON 과 같이 첫 번째 손의 검지 끝 (8) 을 넘긴다
+        float[] points = frame.landmarks[0];
+        listener.onHandMoved(points[8 * 3], points[8 * 3 + 1]);
+    }
 }
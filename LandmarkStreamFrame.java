@@ -0,0 +1,94 @@
+package org.example;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+// landmark_stream.py 의 21개 랜드마크 스트림 디코더 (레이아웃은 landmark_stream.py 참고)
+// delta 는 손마다 마지막 keyframe 기준이라 연결마다 디코더 하나를 계속 써야 한다.
+public class LandmarkStreamFrame {
+    public static final int KIND = 0x4C;
+    public static final int VERSION = 2;
+    public static final int HEADER_SIZE = 16;
+    public static final int HAND_HEADER_SIZE = 4;
+    public static final int LANDMARK_COUNT = 21 * 3;
+    public static final float STEP = 1.0f / 16384;
+    public static final int DELTA_SCALE = 16;  // delta 단위 = STEP * DELTA_SCALE
+
+    public static final int ENC_KEY = 0;
+    public static final int ENC_DELTA = 1;
+
+    public static final int MAX_HANDS = 2;  // GestureFrame.HAND_RIGHT / HAND_LEFT
+
+    public long sequence;
+    public double timestamp;
+    public int handCount;  // 이번 프레임에서 복원된 손 수
+    public final int[] handIds = new int[MAX_HANDS];
+    public final float[][] landmarks = new float[MAX_HANDS][LANDMARK_COUNT];
+    public int missing;  // 기준 keyframe 을 못 받아 건너뛴 손 수 (누적)
+
+    private final int[] keyIds = {-1, -1};
+    private final int[][] keyValues = new int[MAX_HANDS][LANDMARK_COUNT];
+
+    public static boolean isLandmarkFrame(ByteBuffer buffer) {
+        return buffer.remaining() >= HEADER_SIZE && (buffer.get(buffer.position()) & 0xFF) == KIND;
+    }
+
+    public float[] hand(int handId) {
+        for (int i = 0; i < handCount; i++) {
+            if (handIds[i] == handId) {
+                return landmarks[i];
+            }
+        }
+        return null;
+    }
+
+    // 새 객체를 만들지 않고 기존 프레임에 덮어쓴다
+    public LandmarkStreamFrame decode(ByteBuffer buffer) {
+        ByteBuffer in = buffer.duplicate().order(ByteOrder.LITTLE_ENDIAN);
+        int start = in.position();
+
+        int kind = in.get(start) & 0xFF;
+        int version = in.get(start + 1) & 0xFF;
+        if (kind != KIND || version != VERSION) {
+            throw new IllegalArgumentException("not a landmark stream frame (kind " + kind + ", version " + version + ")");
+        }
+        int count = in.get(start + 2) & 0xFF;
+        sequence = in.getInt(start + 4) & 0xFFFFFFFFL;
+        timestamp = in.getDouble(start + 8);
+
+        handCount = 0;
+        int offset = start + HEADER_SIZE;
+        for (int h = 0; h < count; h++) {
+            int handId = in.get(offset) & 0xFF;
+            int encoding = in.get(offset + 1) & 0xFF;
+            int keyId = in.getShort(offset + 2) & 0xFFFF;
+            offset += HAND_HEADER_SIZE;
+            int body = offset;
+            offset += encoding == ENC_KEY ? LANDMARK_COUNT * 2 : LANDMARK_COUNT;
+
+            // 손 id 가 없는 (HAND_NONE) 손은 keyframe 을 둘 자리가 없으므로 건너뛴다
+            if (handId >= MAX_HANDS) {
+                continue;
+            }
+            int[] key = keyValues[handId];
+            float[] out = landmarks[handCount];
+            if (encoding == ENC_KEY) {
+                keyIds[handId] = keyId;
+                for (int i = 0; i < LANDMARK_COUNT; i++) {
+                    key[i] = in.getShort(body + i * 2);
+                    out[i] = key[i] * STEP;
+                }
+            } else {
+                if (keyIds[handId] != keyId) {
+                    missing++;
+                    continue;
+                }
+                for (int i = 0; i < LANDMARK_COUNT; i++) {
+                    out[i] = (key[i] + in.get(body + i) * DELTA_SCALE) * STEP;
+                }
+            }
+            handIds[handCount++] = handId;
+        }
+        return this;
+    }
+}
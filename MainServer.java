@@ -4,9 +4,12 @@ import org.java_websocket.handshake.ClientHandshake;
 import org.java_websocket.server.WebSocketServer;
 import java.io.IOException;
 import java.net.InetSocketAddress;
+import java.nio.ByteBuffer;
 
 public class MainServer extends WebSocketServer {
     private final GestureRouter router;
+    private final GestureFrame frame = new GestureFrame();
+    private final LandmarkStreamFrame landmarkFrame = new LandmarkStreamFrame();
 
     public MainServer(int port, GestureRouter router) {
         super(new InetSocketAddress(port));
@@ -28,6 +31,24 @@ public class MainServer extends WebSocketServer {
         router.route(message);
     }
 
+    @Override
+    public void onMessage(WebSocket conn, ByteBuffer message) {
+        try {
+            // 0 번 바이트로 제스처 프레임과 랜드마크 스트림을 구분
+            if (LandmarkStreamFrame.isLandmarkFrame(message)) {
+                synchronized (landmarkFrame) {
+                    router.route(landmarkFrame.decode(message));
+                }
+                return;
+            }
+            synchronized (frame) {
+                router.route(frame.decode(message));
+            }
+        } catch (IllegalArgumentException | IndexOutOfBoundsException e) {
+            System.err.println("Binary frame error: " + e.getMessage());
+        }
+    }
+
     @Override
     public void onError(WebSocket conn, Exception ex) {
         ex.printStackTrace();
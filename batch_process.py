@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from gesture_state import DEBOUNCE
+
+log = logging.getLogger("gesture_hud")
+
+# 녹화된 세션 영상을 프로세스 풀로 일괄 처리해서 프레임별 랜드마크 / 제스처 판정을 NPZ 로 저장한다.
+#
+# 영상 하나를 segment_frames 프레임씩 잘라서 (segment) 워커에 나눠 주므로 영상이 하나뿐이어도
+# 코어 수만큼 병렬로 돈다. segment 마다 결과를 <out>/<이름>.parts/part-NNNNNN.npz 로 바로 쓰고
+# (메모리는 segment 하나 분량만 사용), 모든 segment 가 끝나면 <out>/<이름>.npz 하나로 합친다.
+# 중간에 멈춰도 다시 실행하면 이미 쓴 segment 는 건너뛴다.
+#
+# 출력 열 (F = 프레임 수, E = 이벤트 수)
+#   frame        int32   (F,)            영상 프레임 번호
+#   time         float64 (F,)            영상 시간 (초)
+#   hand_count   uint8   (F,)
+#   hand_id      uint8   (F, 2)          wire_format.HAND_IDS, 없으면 255
+#   landmarks    float32 (F, 2, 21, 3)   필터 전 원본, 없는 손은 NaN
+#   gesture      str     (F, 3)          Right / Left / 양손 제스처의 확정된 제스처 (gesture_state)
+#   event_frame  int32   (E,)            GestureEvent 가 나온 프레임
+#   event_key, event_phase   str (E,)
+#   event_hand   str     (E,)            Right / Left, 양손이면 ""
+#   event_x, event_y, event_dist  float32 (E,)  없으면 NaN
+
+SEGMENT_FRAMES = 1800  # 30fps 기준 1분
+WARMUP_FRAMES = 15  # segment 시작 전에 미리 돌려서 추적 / debounce 상태를 맞춰 둘 프레임 수
+PROGRESS_EVERY = 60  # 워커가 진행 상황을 보고하는 프레임 간격
+MAX_HANDS = 2
+GESTURE_SLOTS = ("Right", "Left", None)
+KEY_DTYPE = "<U24"
+
+FRAME_COLUMNS = ("frame", "time", "hand_count", "hand_id", "landmarks", "gesture")
+EVENT_COLUMNS = ("event_frame", "event_key", "event_phase", "event_hand", "event_x", "event_y", "event_dist")
+
+
+def video_info(path):
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"cannot open video file {path!r}")
+    info = {
+        "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS) or 30.0,
+        "size": os.path.getsize(path),
+        "mtime": os.path.getmtime(path),
+    }
+    cap.release()
+    return info
+
+
+def plan_segments(frames, segment_frames):
+    """[(start, end), ...]. 프레임 수는 컨테이너 정보라 틀릴 수 있으므로 마지막 segment 는 끝까지 (end=None)"""
+    starts = list(range(0, max(frames, 1), segment_frames))
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+
+
+class FrameColumns:
+    """segment 하나의 프레임별 열. 미리 잡은 크기를 넘으면 두 배로 늘린다."""
+
+    def __init__(self, capacity):
+        self.count = 0
+        self.frame = np.empty(capacity, dtype=np.int32)
+        self.time = np.empty(capacity, dtype=np.float64)
+        self.hand_count = np.empty(capacity, dtype=np.uint8)
+        self.hand_id = np.empty((capacity, MAX_HANDS), dtype=np.uint8)
+        self.landmarks = np.empty((capacity, MAX_HANDS, 21, 3), dtype=np.float32)
+        self.gesture = np.empty((capacity, len(GESTURE_SLOTS)), dtype=KEY_DTYPE)
+        self.events = {name: [] for name in EVENT_COLUMNS}
+
+    def _grow(self):
+        for name in FRAME_COLUMNS:
+            column = getattr(self, name)
+            grown = np.empty((len(column) * 2,) + column.shape[1:], dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+
+    def append(self, frame, timestamp, engine, events):
+        from wire_format import HAND_IDS, HAND_NONE
+
+        if self.count == len(self.frame):
+            self._grow()
+        i = self.count
+        buffer = engine.landmarks
+        self.frame[i] = frame
+        self.time[i] = timestamp
+        self.hand_count[i] = buffer.count
+        self.hand_id[i] = HAND_NONE
+        self.landmarks[i] = np.nan
+        for h in range(buffer.count):
+            self.hand_id[i, h] = HAND_IDS.get(buffer.labels[h], HAND_NONE)
+            self.landmarks[i, h] = buffer.points[h]
+        for s, hand in enumerate(GESTURE_SLOTS):
+            self.gesture[i, s] = engine.states.gesture(hand)
+        self.count += 1
+
+        for event in events:
+            payload = event.payload
+            self.events["event_frame"].append(frame)
+            self.events["event_key"].append(event.key)
+            self.events["event_phase"].append(event.phase or "")
+            self.events["event_hand"].append(event.hand or "")
+            self.events["event_x"].append(payload.get("x", np.nan))
+            self.events["event_y"].append(payload.get("y", np.nan))
+            self.events["event_dist"].append(payload.get("current_dist", np.nan))
+
+    def arrays(self):
+        out = {name: getattr(self, name)[:self.count] for name in FRAME_COLUMNS}
+        out["event_frame"] = np.array(self.events["event_frame"], dtype=np.int32)
+        for name in ("event_key", "event_phase", "event_hand"):
+            out[name] = np.array(self.events[name], dtype=KEY_DTYPE)
+        for name in ("event_x", "event_y", "event_dist"):
+            out[name] = np.array(self.events[name], dtype=np.float32)
+        return out
+
+
+def save_npz(path, arrays):
+    # 중간에 죽어도 반쯤 쓴 파일이 완료된 segment 로 보이지 않도록 임시 파일 후 교체
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_batch(path):
+    """batch_process 결과 파일 -> {열 이름: 배열}"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+# ---- 워커 프로세스 ----
+
+_worker = {}
+
+
+def _init_worker(progress):
+    import cv2
+
+    # 프로세스 수만큼 코어를 나눠 쓰므로 OpenCV 내부 스레드는 끈다
+    cv2.setNumThreads(1)
+    from hand_tracking import create_hands
+
+    _worker["hands"] = create_hands()
+    _worker["progress"] = progress
+
+
+def process_segment(task):
+    """segment 하나를 처리해서 part 파일로 쓴다 -> (영상 번호, part 경로, 처리한 프레임 수, 걸린 시간)"""
+    import cv2
+
+    from capture import Capture, VideoFileSource
+    from gesture_engine import GestureEngine
+    from hand_tracking import run_inference
+
+    index, path, fps, start, end, part_path, options = task
+    hands = _worker["hands"]
+    progress = _worker["progress"]
+    t0 = time.perf_counter()
+
+    # 이전 segment 의 추적 상태를 이어받지 않도록
+    if hasattr(hands, "reset"):
+        hands.reset()
+    engine = GestureEngine(rules=options["rules"], smooth=options["smooth"], debounce=options["debounce"],
+                           predict=options["predict"], profile=options["profile"])
+
+    first = max(0, start - options["warmup"])
+    source = VideoFileSource(path, realtime=False)
+    if first:
+        source.cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    cap = Capture(source, ring_size=2, flip=options["flip"])
+    columns = FrameColumns((end - start) if end is not None else SEGMENT_FRAMES)
+
+    frame_index = first
+    reported = 0
+    while end is None or frame_index < end:
+        frame = cap.read()
+        if frame is None:
+            break
+        timestamp = frame_index / fps
+        events = engine.process(run_inference(hands, frame), timestamp)
+        if frame_index >= start:
+            columns.append(frame_index, timestamp, engine, events)
+            if columns.count - reported >= PROGRESS_EVERY:
+                progress.put((index, columns.count - reported))
+                reported = columns.count
+        frame_index += 1
+    cap.release()
+
+    progress.put((index, columns.count - reported))
+    save_npz(part_path, columns.arrays())
+    return index, part_path, columns.count, time.perf_counter() - t0
+
+
+# ---- 메인 프로세스 ----
+
+class VideoJob:
+    """영상 하나의 segment 계획과 체크포인트 (<out>/<이름>.parts/manifest.json)"""
+
+    def __init__(self, index, path, out_dir, segment_frames, options):
+        self.index = index
+        self.path = path
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.output = os.path.join(out_dir, name + ".npz")
+        self.parts_dir = os.path.join(out_dir, name + ".parts")
+        self.manifest_path = os.path.join(self.parts_dir, "manifest.json")
+
+        info = video_info(path)
+        self.fps = info["fps"]
+        self.total = info["frames"]
+        self.done_frames = 0
+        self.manifest = {
+            "video": os.path.abspath(path),
+            "size": info["size"],
+            "mtime": info["mtime"],
+            "fps": info["fps"],
+            "segment_frames": segment_frames,
+            "options": options,
+        }
+        self.segments = plan_segments(info["frames"], segment_frames)
+
+    def part_path(self, i):
+        return os.path.join(self.parts_dir, f"part-{i:06d}.npz")
+
+    def prepare(self, restart=False):
+        """남은 segment 번호 목록. 설정이나 영상이 바뀌었으면 처음부터 (restart 가 아니면 에러)"""
+        if restart and os.path.isdir(self.parts_dir):
+            shutil.rmtree(self.parts_dir)
+        if os.path.exists(self.output) and not os.path.isdir(self.parts_dir) and not restart:
+            return []
+
+        os.makedirs(self.parts_dir, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous != json.loads(json.dumps(self.manifest)):
+                raise SystemExit(f"✗ {self.path}: checkpoint was made with different settings or a changed video "
+                                 f"(remove {self.parts_dir} or use --restart)")
+        else:
+            with open(self.manifest_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+
+        remaining = []
+        for i, (start, end) in enumerate(self.segments):
+            if os.path.exists(self.part_path(i)):
+                self.done_frames += (end if end is not None else self.total) - start
+            else:
+                remaining.append(i)
+        return remaining
+
+    def merge(self, keep_parts=False):
+        parts = [load_batch(self.part_path(i)) for i in range(len(self.segments))]
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        merged["video"] = np.array(self.manifest["video"])
+        merged["fps"] = np.array(self.fps)
+        save_npz(self.output, merged)
+        if not keep_parts:
+            shutil.rmtree(self.parts_dir)
+        return len(merged["frame"]), len(merged["event_frame"])
+
+
+class Progress:
+    def __init__(self, total, interval=0.5, stream=sys.stderr):
+        self.total = max(total, 1)
+        self.done = 0
+        self.interval = interval
+        self.stream = stream
+        self._start = time.perf_counter()
+        self._last = 0.0
+        self._resumed = 0
+
+    def resume(self, frames):
+        self.done += frames
+        self._resumed += frames
+
+    def add(self, frames):
+        self.done += frames
+
+    def show(self, segments_done, segments_total, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = now - self._start
+        fps = (self.done - self._resumed) / elapsed if elapsed > 0 else 0.0
+        left = max(self.total - self.done, 0)
+        eta = f"{left / fps:.0f}s" if fps > 0 else "?"
+        self.stream.write(f"\r[batch] {self.done}/{self.total} frames ({100.0 * self.done / self.total:.1f}%) "
+                          f"{fps:.0f} fps  segments {segments_done}/{segments_total}  ETA {eta}   ")
+        self.stream.flush()
+
+
+def run(args):
+    from calibration import load_profile
+
+    options = {
+        "rules": os.path.abspath(args.rules) if args.rules else None,
+        # 프로필 내용을 manifest 에 넣어서 다시 보정하면 처음부터 다시 처리한다
+        "profile": load_profile(args.profile) if args.profile else None,
+        "smooth": args.smooth,
+        "debounce": args.debounce,
+        "predict": args.predict,
+        "flip": not args.no_flip,
+        "warmup": args.warmup,
+    }
+    os.makedirs(args.out, exist_ok=True)
+
+    jobs = [VideoJob(i, path, args.out, args.segment_frames, options) for i, path in enumerate(args.videos)]
+    tasks = []
+    for job in jobs:
+        for i in job.prepare(args.restart):
+            start, end = job.segments[i]
+            tasks.append((job.index, job.path, job.fps, start, end, job.part_path(i), options))
+
+    progress = Progress(sum(job.total for job in jobs))
+    for job in jobs:
+        progress.resume(job.done_frames)
+    remaining = {job.index: sum(1 for task in tasks if task[0] == job.index) for job in jobs}
+
+    ctx = mp.get_context("spawn")
+    reports = ctx.Queue()
+    start = time.perf_counter()
+    processed = 0
+    results = []
+    if tasks:
+        log.info("%d segments over %d workers", len(tasks), args.workers)
+        with ctx.Pool(args.workers, initializer=_init_worker, initargs=(reports,)) as pool:
+            pending = [pool.apply_async(process_segment, (task,)) for task in tasks]
+            while pending:
+                try:
+                    while True:
+                        _, frames = reports.get(timeout=0.2)
+                        progress.add(frames)
+                except queue.Empty:
+                    pass
+                finished = [p for p in pending if p.ready()]
+                for p in finished:
+                    pending.remove(p)
+                    index, _, frames, _ = p.get()  # 워커 예외는 여기서 다시 올라온다
+                    processed += frames
+                    remaining[index] -= 1
+                progress.show(len(tasks) - len(pending), len(tasks))
+        while not reports.empty():
+            progress.add(reports.get()[1])
+        progress.show(len(tasks), len(tasks), force=True)
+        print(file=progress.stream)
+    elapsed = time.perf_counter() - start
+
+    for job in jobs:
+        if remaining[job.index] == 0 and os.path.isdir(job.parts_dir):
+            frames, events = job.merge(args.keep_parts)
+            results.append({"video": job.path, "output": job.output, "frames": frames, "events": events})
+            print(f"✓ {job.path} -> {job.output} ({frames} frames, {events} events)")
+
+    return {
+        "videos": results,
+        "workers": args.workers,
+        "processed_frames": processed,
+        "elapsed": elapsed,
+        "fps": processed / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹화된 영상을 프로세스 풀로 일괄 처리해서 랜드마크 / 제스처를 NPZ 로 저장")
+    parser.add_argument("videos", nargs="+", help="처리할 영상 파일")
+    parser.add_argument("--out", default="batch_out", help="결과 디렉터리 (영상마다 <이름>.npz)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    parser.add_argument("--segment-frames", type=int, default=SEGMENT_FRAMES, metavar="N",
+                        help="작업 / 체크포인트 단위 프레임 수")
+    parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES, metavar="N",
+                        help="segment 경계에서 추적 상태를 맞추려고 앞에서 미리 돌릴 프레임 수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 지우고 처음부터")
+    parser.add_argument("--keep-parts", action="store_true", help="합친 뒤에도 segment 파일을 남김")
+    parser.add_argument("--no-flip", action="store_true", help="좌우 반전하지 않음 (이미 반전된 녹화본)")
+    parser.add_argument("--smooth", action="store_true", help="One-Euro 필터 적용")
+    parser.add_argument("--rules", metavar="PATH", help="제스처 규칙 파일 (기본: gestures.json)")
+    parser.add_argument("--profile", metavar="USER", help="사용자 보정 프로필 (calibration.py, 이름 또는 경로)")
+    parser.add_argument("--predict", type=float, default=0, metavar="SEC", help="예측 위치 px / py 포함")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, metavar="SEC", help="제스처 전환 debounce")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import types
+
+import numpy as np
+
+from gesture_engine import GestureEngine, extract_landmarks
+from gesture_rules import load_rules
+from ws_sender import WebSocketSender
+
+FRAME_BUDGET_MS = 16.0  # THROTTLE_INTERVAL 과 같은 프레임 예산
+
+
+def summarize(samples):
+    ms = np.asarray(samples, dtype=np.float64) * 1000.0
+    if not len(ms):
+        return None
+    total = ms.sum() / 1000.0
+    return {
+        "count": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "throughput_per_s": float(len(ms) / total) if total > 0 else 0.0,
+    }
+
+
+def measure(fn, inputs, warmup=10):
+    for item in inputs[:warmup]:
+        fn(item)
+    samples = []
+    perf_counter = time.perf_counter
+    for item in inputs:
+        start = perf_counter()
+        fn(item)
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def synthetic_hands(count, seed=0):
+    """손 0~2개가 섞인 가짜 랜드마크 스트림: [(timestamp, [(label, (21, 3) 배열), ...]), ...]"""
+    rng = np.random.default_rng(seed)
+    base = (rng.random((21, 3)) * 0.2 + 0.4).astype(np.float32)
+    layouts = (["Right"], ["Right"], ["Left"], ["Right", "Left"], [])
+    frames = []
+    for i in range(count):
+        hands = []
+        for label in layouts[i % len(layouts)]:
+            points = base + rng.normal(0, 0.03, (21, 3)).astype(np.float32)
+            if rng.random() < 0.3:
+                points[4] = points[8] + rng.normal(0, 0.005, 3)  # 핀치
+            hands.append((label, points))
+        frames.append((i / 60.0, hands))
+    return frames
+
+
+def load_hands(log_path, limit=None):
+    from landmark_log import read_log
+
+    frames = []
+    for timestamp, hands in read_log(log_path):
+        frames.append((timestamp, hands))
+        if limit and len(frames) >= limit:
+            break
+    return frames
+
+
+def as_mediapipe_landmarks(points):
+    # extract_landmarks 가 받는 hand_landmarks.landmark[i].x/y/z 형태
+    return types.SimpleNamespace(landmark=[types.SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                           for x, y, z in points])
+
+
+def bench_landmark_stages(frames):
+    stages = {}
+    all_hands = [points for _, hands in frames for _, points in hands]
+    if not all_hands:
+        return stages
+
+    mp_hands = [as_mediapipe_landmarks(points) for points in all_hands]
+    out = np.empty((21, 3), dtype=np.float32)
+    stages["extract_landmarks"] = summarize(measure(lambda h: extract_landmarks(h, out), mp_hands))
+
+    plan = load_rules()
+    batches = [points[None] for points in all_hands]
+    stages["rule_features"] = summarize(measure(plan.features, batches))
+    values = [plan.features(points)[0].tolist() for points in batches]
+    stages["rule_recognize"] = summarize(measure(lambda v: plan.recognize("Right", v, "none"), values))
+
+    engine = GestureEngine()
+    events = []
+
+    def process(frame):
+        events.extend(engine.process(frame[1], frame[0]))
+
+    stages["engine_process"] = summarize(measure(process, frames))
+
+    if events:
+        stages["json_dumps"] = summarize(measure(lambda e: e.to_json(), events))
+        stages["binary_encode"] = summarize(measure(lambda e: e.to_binary(), events))
+
+        # 전송 스레드를 띄우지 않고 큐에 넣는 비용만 측정 (트래킹 루프가 실제로 기다리는 부분)
+        sender = WebSocketSender()
+        messages = [(e.to_json(), e.key) for e in events]
+        stages["send"] = summarize(measure(lambda m: sender.send(*m), messages))
+
+    return stages
+
+
+def bench_ws_send(url, messages):
+    import websocket
+
+    ws = websocket.create_connection(url, timeout=2.0)
+    try:
+        return summarize(measure(ws.send, messages))
+    finally:
+        ws.close()
+
+
+def bench_image_stages(count, width, height, seed=0):
+    stages = {}
+    try:
+        import cv2
+    except ImportError:
+        return stages
+
+    rng = np.random.default_rng(seed)
+    images = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 60))]
+    images = (images * (count // len(images) + 1))[:count]
+
+    stages["flip_cvtcolor"] = summarize(measure(
+        lambda f: cv2.cvtColor(cv2.flip(f, 1), cv2.COLOR_BGR2RGB), images))
+
+    # capture.Capture 방식: 같은 버퍼에서 in-place 로 변환 + 반전 (할당 없음)
+    def inplace(f):
+        cv2.cvtColor(f, cv2.COLOR_BGR2RGB, dst=f)
+        cv2.flip(f, 1, dst=f)
+
+    buffers = [f.copy() for f in images[:60]]
+    buffers = (buffers * (count // len(buffers) + 1))[:count]
+    stages["flip_cvtcolor_inplace"] = summarize(measure(inplace, buffers))
+
+    try:
+        import mediapipe as mp
+    except ImportError:
+        return stages
+
+    # 합성 이미지에는 손이 없으므로 검출 경로의 비용만 측정된다
+    with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                  min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
+        rgbs = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in images[:min(count, 200)]]
+        stages["hands_process"] = summarize(measure(hands.process, rgbs, warmup=5))
+    return stages
+
+
+def bench_roi(path, count, full_every=30):
+    """손이 보이는 녹화 영상에서 전체 프레임 추론과 RoiScheduler 경로 (--roi) 의 프레임당 추론 시간을 비교한다.
+
+    합성 이미지에는 손이 없어 ROI 가 잡히지 않으므로 영상이 있어야 의미가 있다. 두 경로 모두 같은 프레임을
+    같은 순서로 넣고, 모델마다 빈 프레임 warm-up 을 먼저 돌린다 (추적 상태가 있어서 measure 의 warmup 은 쓰지 않는다).
+    """
+    try:
+        import mediapipe  # noqa: F401
+
+        from capture import Capture, VideoFileSource
+    except ImportError:
+        return {}
+    from hand_tracking import create_hands, reset_tracking, run_inference, warm_up
+    from roi_scheduler import RoiScheduler
+
+    cap = Capture(VideoFileSource(path, realtime=False), ring_size=2)
+    frames = []
+    while len(frames) < count:
+        frame = cap.read()
+        if frame is None:
+            break
+        frames.append(frame.copy())
+    cap.release()
+    if not frames:
+        return {}
+
+    stages = {}
+    with create_hands() as hands:
+        warm_up(hands, frames[0].shape)
+        stages["inference_full_frame"] = summarize(measure(lambda f: run_inference(hands, f), frames, warmup=0))
+
+    roi = RoiScheduler(full_every=full_every)
+    with create_hands() as hands, create_hands() as crop_hands:
+        warm_up(hands, frames[0].shape)
+        warm_up(crop_hands, frames[0].shape)
+
+        def scheduled(frame):
+            roi.process(frame, lambda image: run_inference(hands, image),
+                        lambda image: run_inference(crop_hands, image), lambda: reset_tracking(crop_hands))
+
+        stages["inference_roi"] = summarize(measure(scheduled, frames, warmup=0))
+    print(roi.summary(), file=sys.stderr)
+    return stages
+
+
+def bench_startup(runs, width, height):
+    """startup.py 를 새 프로세스로 runs 번씩 실행한다 (import 시간은 프로세스마다 한 번만 잴 수 있다).
+
+    단계별 시간은 동시 시작 기준, ready / first_inference 는 프로세스 시작부터의 시간을 두 방식 모두 잰다.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup.py")
+    samples = {}
+    for mode in ("parallel", "sequential"):
+        for _ in range(runs):
+            command = [sys.executable, script, "--json", "--width", str(width), "--height", str(height)]
+            if mode == "sequential":
+                command.append("--sequential")
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                # cv2 / MediaPipe 가 없는 환경
+                print(f"✗ startup probe failed: {result.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+                return {}
+            report = json.loads(result.stdout.splitlines()[-1])
+            if mode == "parallel":
+                for name, value in report["phases"].items():
+                    samples.setdefault(f"startup_{name}", []).append(value)
+            for name in ("ready", "first_inference"):
+                samples.setdefault(f"startup_{name}_{mode}", []).append(report["marks"][name])
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def run(args):
+    frames = load_hands(args.log, args.frames) if args.log else synthetic_hands(args.frames, args.seed)
+
+    stages = bench_landmark_stages(frames)
+    if not args.skip_image:
+        stages.update(bench_image_stages(args.frames, args.width, args.height, args.seed))
+    if args.ws_url:
+        messages = [json.dumps({"pointer": {"action": "pointer", "x": 0.5, "y": 0.5}})] * args.frames
+        stages["ws_send"] = bench_ws_send(args.ws_url, messages)
+    if args.roi_video:
+        stages.update(bench_roi(args.roi_video, args.frames, args.roi_full_every))
+    if args.startup_runs and not args.skip_image:
+        stages.update(bench_startup(args.startup_runs, args.width, args.height))
+
+    return {
+        "meta": {
+            "source": args.log or "synthetic",
+            "frames": len(frames),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": np.__version__,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "frame_budget_ms": FRAME_BUDGET_MS,
+        "stages": stages,
+    }
+
+
+def compare(base, new, tolerance):
+    """p95 가 tolerance 이상 늘어난 단계와 프레임 예산 초과를 찾는다."""
+    regressions = []
+    rows = []
+    for name, stats in new["stages"].items():
+        before = base["stages"].get(name)
+        if not stats or not before:
+            continue
+        ratio = stats["p95_ms"] / before["p95_ms"] if before["p95_ms"] > 0 else 1.0
+        rows.append((name, before["p95_ms"], stats["p95_ms"], ratio))
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+
+    per_frame = [s["p95_ms"] for name, s in new["stages"].items()
+                 if s and name in ("flip_cvtcolor", "hands_process", "engine_process", "send")]
+    frame_p95 = sum(per_frame)
+    over_budget = frame_p95 > new.get("frame_budget_ms", FRAME_BUDGET_MS)
+    return rows, regressions, frame_p95, over_budget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="프레임별 hot path / 시작 시간 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="단계별 지연 시간 측정 후 JSON 출력")
+    run_parser.add_argument("--log", help="landmark_log 기록 파일 (기본: 합성 랜드마크)")
+    run_parser.add_argument("--frames", type=int, default=2000)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--width", type=int, default=640)
+    run_parser.add_argument("--height", type=int, default=480)
+    run_parser.add_argument("--skip-image", action="store_true", help="cv2 / MediaPipe 단계 생략")
+    run_parser.add_argument("--startup-runs", type=int, default=3, metavar="N",
+                            help="시작 단계 측정 프로세스 수 (방식마다, 0 이면 생략)")
+    run_parser.add_argument("--roi-video", metavar="PATH",
+                            help="손이 보이는 영상으로 전체 프레임 / --roi 추론 시간 비교 (MediaPipe 필요)")
+    run_parser.add_argument("--roi-full-every", type=int, default=30, metavar="N",
+                            help="--roi-video 에서 N 프레임마다 전체 프레임 검출")
+    run_parser.add_argument("--ws-url", help="실제 websocket 전송도 측정 (예: ws://localhost:8884)")
+    run_parser.add_argument("--out", help="결과 JSON 저장 경로 (기본: stdout)")
+
+    cmp_parser = sub.add_parser("compare", help="두 실행 결과 비교 (회귀 시 exit code 1)")
+    cmp_parser.add_argument("base")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--tolerance", type=float, default=0.10, help="허용하는 p95 증가율 (기본 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = json.dumps(run(args), indent=2)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows, regressions, frame_p95, over_budget = compare(base, new, args.tolerance)
+    for name, before, after, ratio in rows:
+        mark = "✗" if name in regressions else "✓"
+        print(f"{mark} {name:32s} p95 {before:8.3f}ms -> {after:8.3f}ms ({(ratio - 1) * 100:+.1f}%)")
+    print(f"{'✗' if over_budget else '✓'} per-frame p95 {frame_p95:.3f}ms (budget {FRAME_BUDGET_MS}ms)")
+    return 1 if regressions or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import operator
+import os
+import time
+
+import numpy as np
+
+from gesture_rules import DEFAULT_RULES, RulePlan
+from landmarks import INDEX_TIP, MIDDLE_TIP, PINKY_TIP, RING_TIP, WRIST
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+SCALE_TAU = 0.5  # 손 크기 추정값의 시간 상수 (초). 손가락을 굽히는 속도보다 훨씬 느리게
+SECONDS = 3.0  # 단계마다 기록하는 시간
+COUNTDOWN = 3.0  # 단계 사이 준비 시간
+MIN_FRAMES = 30
+PROMPTS = {"open": "손을 활짝 펴고 손바닥이 카메라를 향하게 하세요"}
+TIPS = [INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP]
+
+
+class HandScale:
+    """손마다 캐시한 손 크기 추정값.
+
+    규칙 파일의 scale 특징 (손바닥 크기 x 펼친 손 비율) 을 시간 상수 tau 로 천천히 따라간다.
+    손가락을 굽혀도 줄어들지 않고, 한 프레임 튀는 랜드마크에도 흔들리지 않는다.
+    손이 처음 보이거나 다시 나타나면 그 프레임 값에서 시작한다.
+    """
+
+    def __init__(self, tau=SCALE_TAU, max_hands=2):
+        self.tau = tau
+        self.max_hands = max_hands
+        self._scale = np.zeros(max_hands, dtype=np.float64)
+        self._t_prev = np.zeros(max_hands, dtype=np.float64)
+        self._initialized = np.zeros(max_hands, dtype=bool)
+
+    def reset(self):
+        self._initialized[:] = False
+
+    def update(self, size, t, hand_ids=None):
+        """size: 이번 프레임 손 크기 (hands,), t: 초 단위 timestamp -> 캐시된 손 크기 (hands,)
+
+        hand_ids 는 OneEuroFilter.filter 와 같다.
+        """
+        ids = np.arange(len(size)) if hand_ids is None else np.asarray(hand_ids, dtype=np.intp)
+
+        lost = np.ones(self.max_hands, dtype=bool)
+        lost[ids] = False
+        self._initialized[lost] = False
+
+        dt = np.maximum(t - self._t_prev[ids], 0.0)
+        alpha = np.where(self._initialized[ids], -np.expm1(-dt / self.tau), 1.0)
+        previous = self._scale[ids]
+        scale = previous + alpha * (np.nan_to_num(size, nan=previous) - previous)
+
+        self._scale[ids] = scale
+        self._t_prev[ids] = t
+        self._initialized[ids] = True
+        return scale
+
+
+def profile_path(user):
+    return os.path.join(PROFILE_DIR, f"{user}.json")
+
+
+def load_profile(user_or_path):
+    """사용자 이름 (profiles/<이름>.json) 또는 파일 경로 -> 프로필 dict"""
+    path = user_or_path if os.path.isfile(user_or_path) else profile_path(user_or_path)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_profile(profile, path=None):
+    path = path or profile_path(profile["user"])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+    return path
+
+
+def _scale_index(plan):
+    for out, kind, _ in plan.derived:
+        if kind == "scale":
+            return out
+    raise ValueError("rules have no scale feature")
+
+
+def _split(open_values, op, gesture_values):
+    """펼친 손 / 제스처 분포 사이 1/3, 2/3 지점 -> (임계값, 유지 중 임계값). 분포가 겹치면 None"""
+    below = op in (operator.lt, operator.le)
+    inside = np.percentile(gesture_values, 95 if below else 5)
+    outside = np.percentile(open_values, 5 if below else 95)
+    gap = outside - inside
+    if (gap <= 0) if below else (gap >= 0):
+        return None
+    return inside + gap / 3, inside + gap * 2 / 3
+
+
+def build_profile(user, phases, rules=DEFAULT_RULES):
+    """phases: {"open": [(21, 3) 배열, ...], 제스처 이름: [...], ...} -> 프로필 dict
+
+    open_ratio: 펼친 손의 손목-손끝 평균 거리 / 손바닥 크기 (중앙값).
+    제스처 단계가 있으면 그 제스처 조건마다 펼친 손과 제스처 분포 사이로 임계값을 다시 잡는다.
+    """
+    open_hands = np.asarray(phases.get("open", ()), dtype=np.float32).reshape(-1, 21, 3)
+    if len(open_hands) < MIN_FRAMES:
+        raise ValueError(f"need at least {MIN_FRAMES} open-hand frames, got {len(open_hands)}")
+
+    with open(rules, encoding="utf-8") as f:
+        config = json.load(f)
+
+    # 손바닥 크기 (open_ratio 1) 로 먼저 계산해서 펼친 손 비율을 구한다
+    raw = RulePlan(config, {"open_ratio": 1.0})
+    palm = raw.features(open_hands)[:, _scale_index(raw)]
+    tips = open_hands[:, TIPS, :2] - open_hands[:, [WRIST], :2]
+    size = np.sqrt((tips ** 2).sum(axis=2)).mean(axis=1)
+    valid = palm > 0
+    open_ratio = float(np.median(size[valid] / palm[valid]))
+
+    profile = {"version": 1, "user": user, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "open_ratio": round(open_ratio, 4),
+               "frames": {name: len(hands) for name, hands in phases.items()}, "thresholds": {}, "stats": {}}
+
+    plan = RulePlan(config, profile)
+    open_values = plan.features(open_hands)
+    rules_by_name = {rule.name: rule for rule in plan.hand_rules}
+    for name, hands in phases.items():
+        if name == "open":
+            values = open_values
+        else:
+            values = plan.features(np.asarray(hands, dtype=np.float32).reshape(-1, 21, 3))
+        profile["stats"][name] = {feature: [round(float(v), 4) for v in np.percentile(values[:, i], [5, 50, 95])]
+                                  for i, feature in enumerate(plan.names) if i not in plan.pair_columns}
+        if name == "open":
+            continue
+        rule = rules_by_name.get(name)
+        if rule is None:
+            raise ValueError(f"unknown one-hand gesture {name!r}")
+        if len(values) < MIN_FRAMES:
+            raise ValueError(f"need at least {MIN_FRAMES} {name!r} frames, got {len(values)}")
+
+        thresholds = {}
+        for index, op, _, _ in rule.conditions:
+            split = _split(open_values[:, index], op, values[:, index])
+            if split is not None:
+                thresholds[plan.names[index]] = [round(float(v), 4) for v in split]
+        profile["thresholds"][name] = thresholds
+    return profile
+
+
+def record_phases(spec, names, seconds=SECONDS, width=640, height=480, countdown=COUNTDOWN):
+    """카메라로 단계마다 seconds 초씩 첫 번째 손을 기록한다 -> {단계: [(21, 3) 배열, ...]}"""
+    from capture import Capture, open_source
+    from hand_tracking import create_hands, run_inference
+    from landmarks import LandmarkBuffer
+
+    cap = Capture(open_source(spec, width, height))
+    buffer = LandmarkBuffer(1)
+    phases = {}
+    try:
+        with create_hands() as hands:
+            for name in names:
+                print(f"→ {PROMPTS.get(name, f'{name} 제스처를 유지하세요')} ({countdown:.0f}초 뒤 {seconds:.0f}초 기록)")
+                start = time.time()
+                frames = phases[name] = []
+                while cap.isOpened() and time.time() - start < countdown + seconds:
+                    frame = cap.read()
+                    if frame is None:
+                        break
+                    result = run_inference(hands, frame)
+                    if time.time() - start >= countdown and buffer.fill(result):
+                        frames.append(buffer.points[0].copy())
+                print(f"  {len(frames)} frames")
+    finally:
+        cap.release()
+    return phases
+
+
+def read_phases(logs):
+    """["open=a.ghlm", "pinch=b.ghlm"] -> 기록 파일에서 프레임마다 첫 번째 손"""
+    from landmark_log import read_log
+
+    phases = {}
+    for item in logs:
+        name, _, path = item.partition("=")
+        phases[name] = [hands[0][1].copy() for _, hands in read_log(path) if hands]
+    return phases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사용자별 손 크기 / 제스처 임계값 프로필 만들기")
+    parser.add_argument("user", help="프로필 이름 (profiles/<user>.json)")
+    parser.add_argument("--gesture", action="append", default=[], metavar="NAME",
+                        help="펼친 손 다음에 기록해서 임계값을 맞출 손 하나짜리 제스처 (여러 번 지정, 예: pinch)")
+    parser.add_argument("--camera", type=int, default=1, help="cv2.VideoCapture 카메라 번호")
+    parser.add_argument("--source", metavar="SPEC", help="카메라 대신 비디오 파일 / 이미지 디렉터리 (capture.py)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--seconds", type=float, default=SECONDS, help="단계마다 기록할 시간 (초)")
+    parser.add_argument("--from-log", action="append", default=[], metavar="PHASE=PATH",
+                        help="카메라 대신 landmark_log 기록 사용 (예: open=open.ghlm pinch=pinch.ghlm)")
+    parser.add_argument("--rules", default=DEFAULT_RULES, metavar="PATH", help="제스처 규칙 파일 (기본: gestures.json)")
+    parser.add_argument("--out", metavar="PATH", help="저장 경로 (기본: profiles/<user>.json)")
+    args = parser.parse_args(argv)
+
+    if args.from_log:
+        phases = read_phases(args.from_log)
+    else:
+        phases = record_phases(args.source or args.camera, ["open"] + args.gesture, args.seconds,
+                               args.width, args.height)
+
+    try:
+        profile = build_profile(args.user, phases, args.rules)
+    except ValueError as e:
+        raise SystemExit(f"✗ {e}")
+
+    print(f"open_ratio={profile['open_ratio']} ({profile['frames']['open']} open-hand frames)")
+    for name, thresholds in profile["thresholds"].items():
+        if not thresholds:
+            print(f"✗ {name}: gesture and open-hand frames overlap, keeping default thresholds")
+        for feature, (threshold, sticky) in thresholds.items():
+            print(f"  {name}.{feature}: {threshold} (hold {sticky})")
+    print(f"✓ profile saved to {save_profile(profile, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
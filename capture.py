@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+RING_SIZE = 8  # 파이프라인 모드에서 동시에 살아 있는 프레임 (capture / 큐 / infer / send / 표시) 보다 넉넉하게
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameRing:
+    """미리 할당한 프레임 버퍼를 순서대로 돌려 쓴다.
+
+    size 프레임 뒤에 같은 버퍼를 덮어쓰므로, 그보다 오래 프레임을 붙잡고 있으면 안 된다.
+    해상도가 바뀔 때만 새로 할당한다 (allocations 로 확인).
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.allocations = 0
+        self._buffers = []
+        self._index = 0
+
+    def next(self, shape):
+        if not self._buffers or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self.size)]
+            self.allocations += self.size
+            self._index = 0
+        buffer = self._buffers[self._index]
+        self._index = (self._index + 1) % self.size
+        return buffer
+
+
+class _Pacer:
+    """fps 에 맞춰 read 를 늦춘다 (파일 / 합성 소스를 카메라처럼 재생)"""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self._next_time = time.time()
+
+    def wait(self):
+        if not self.fps:
+            return
+        delay = self._next_time - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_time = max(self._next_time, time.time()) + 1.0 / self.fps
+
+
+# 소스는 shape (height, width, 3) 와 read(out) -> (성공 여부, BGR 프레임) 를 가진다.
+# 돌려주는 프레임은 가능하면 out 자체이고, 크기가 다르면 새 배열이다.
+
+class CameraSource:
+    """V4L2 (리눅스) 또는 OS 기본 백엔드 카메라"""
+
+    def __init__(self, index, width=640, height=480):
+        backend = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+        # 해상도를 열 때 같이 넘긴다. 연 뒤에 set 하면 V4L2 는 스트림을 한 번 더 다시 연다
+        params = [cv2.CAP_PROP_FRAME_WIDTH, width, cv2.CAP_PROP_FRAME_HEIGHT, height]
+        try:
+            self.cap = cv2.VideoCapture(index, backend, params)
+        except (TypeError, cv2.error):
+            # params 인자가 없는 OpenCV (4.5.2 이전)
+            self.cap = cv2.VideoCapture(index, backend)
+        if not self.cap.isOpened() and backend != cv2.CAP_ANY:
+            self.cap = cv2.VideoCapture(index)
+        if (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) != (width, height):
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # 드라이버가 해상도를 바꿨을 수 있으므로 실제 값을 쓴다
+        self.shape = (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height,
+                      int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or width, 3)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, out):
+        return self.cap.read(out)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """비디오 파일. realtime 이면 파일 fps 에 맞춰 재생하고, loop 이면 끝에서 처음으로 돌아간다."""
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"cannot open video file {path!r}")
+        self.shape = (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        self._pacer = _Pacer((self.cap.get(cv2.CAP_PROP_FPS) or 30) if realtime else 0)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, out):
+        self._pacer.wait()
+        ok, frame = self.cap.read(out)
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read(out)
+        return ok, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    """디렉터리의 이미지를 이름 순서로 재생. 첫 이미지와 크기가 다르면 그 크기로 맞춘다.
+
+    cv2.imread 는 디코딩 버퍼를 새로 만들므로 이 소스만은 프레임마다 할당이 남는다.
+    """
+
+    def __init__(self, path, fps=30, loop=False):
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise ValueError(f"no images in {path!r}")
+        first = cv2.imread(self.paths[0])
+        if first is None:
+            raise ValueError(f"cannot read image {self.paths[0]!r}")
+        self.shape = first.shape
+        self.loop = loop
+        self._pacer = _Pacer(fps)
+        self._index = 0
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, out):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self._index = 0
+        self._pacer.wait()
+        image = cv2.imread(self.paths[self._index])
+        self._index += 1
+        if image is None:
+            return False, None
+        if image.shape != out.shape:
+            cv2.resize(image, (out.shape[1], out.shape[0]), dst=out)
+        else:
+            np.copyto(out, image)
+        return True, out
+
+    def release(self):
+        self._opened = False
+
+
+class SyntheticSource:
+    """카메라 없이 돌리기 위한 합성 프레임. 어두운 배경에 밝은 원이 움직인다 (blank 면 검은 화면).
+
+    버퍼에 바로 그리므로 할당이 없다. frames 가 None 이면 무한.
+    """
+
+    def __init__(self, width=640, height=480, frames=None, fps=30, blank=False):
+        self.shape = (height, width, 3)
+        self.frames = frames
+        self.blank = blank
+        self._pacer = _Pacer(fps)
+        self._count = 0
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, out):
+        if not self._opened or (self.frames is not None and self._count >= self.frames):
+            return False, None
+        self._pacer.wait()
+        self._count += 1
+
+        out.fill(0 if self.blank else 32)
+        if not self.blank:
+            height, width = out.shape[:2]
+            t = self._count / 30.0
+            center = (int(width * (0.5 + 0.3 * math.cos(t))), int(height * (0.5 + 0.3 * math.sin(2 * t))))
+            cv2.circle(out, center, max(4, min(width, height) // 10), (200, 180, 160), -1)
+        return True, out
+
+    def release(self):
+        self._opened = False
+
+
+def open_source(spec, width=640, height=480, fps=30, loop=False):
+    """spec: "0", "1" -> 카메라, "dummy" -> 검은 화면, "synthetic" -> 움직이는 합성 화면,
+    디렉터리 -> 이미지 시퀀스, 그 외 -> 비디오 파일 경로"""
+    spec = str(spec)
+    if spec == "dummy":
+        return SyntheticSource(width, height, fps=fps, blank=True)
+    if spec == "synthetic":
+        return SyntheticSource(width, height, fps=fps)
+    if spec.isdigit():
+        return CameraSource(int(spec), width, height)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=fps, loop=loop)
+    return VideoFileSource(spec, loop=loop)
+
+
+class Capture:
+    """소스 -> 링 버퍼 -> 좌우 반전된 RGB 프레임.
+
+    read() 는 소스가 링 버퍼에 바로 쓰게 하고, BGR->RGB 변환과 좌우 반전을 같은 버퍼에서
+    in-place 로 한다. 해상도가 일정하면 프레임마다 새 배열을 만들지 않는다.
+    반환된 프레임은 링 크기만큼 뒤에 덮어써진다.
+    """
+
+    def __init__(self, source, ring_size=RING_SIZE, flip=True):
+        self.source = source
+        self.flip = flip
+        self.ring = FrameRing(ring_size)
+        self.frames = 0
+        self.copies = 0  # 소스가 링 버퍼에 쓰지 못해 따로 복사한 프레임 수
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read(self):
+        """다음 프레임 (height, width, 3) RGB uint8, 끝이면 None"""
+        buffer = self.ring.next(self.source.shape)
+        ok, frame = self.source.read(buffer)
+        if not ok or frame is None:
+            return None
+
+        if frame is not buffer:
+            # 드라이버가 다른 해상도로 줬으면 다음 프레임부터 그 크기로 링을 다시 만든다
+            self.source.shape = frame.shape
+            buffer = self.ring.next(frame.shape)
+            np.copyto(buffer, frame)
+            self.copies += 1
+
+        cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+        if self.flip:
+            cv2.flip(buffer, 1, dst=buffer)
+        self.frames += 1
+        return buffer
+
+    def release(self):
+        self.source.release()
+
+    def summary(self):
+        return f"[capture] frames={self.frames} allocations={self.ring.allocations} copies={self.copies}"
+
+
+def to_bgr(frame, out=None):
+    """화면 표시 / JPEG 인코딩용 (Capture 프레임은 RGB)"""
+    return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=out)
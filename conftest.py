@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+# hand_tracking_test.py 는 카메라 / 중계 서버에 바로 붙는 수동 실행 스크립트라서 pytest 가 모으지 않는다
+collect_ignore = ["hand_tracking_test.py"]
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+import numpy as np
+
+from calibration import HandScale, load_profile
+from gesture_rules import DEFAULT_RULES, RuleFile
+from gesture_state import GestureStateMachine
+from hand_identity import HandIdentity
+from landmark_predictor import LandmarkPredictor
+from landmarks import LandmarkBuffer, landmarks_to_array, rounded_xy
+from one_euro_filter import OneEuroFilter
+from wire_format import HAND_IDS, HAND_NONE, encode_gesture
+
+THROTTLE_INTERVAL = 0.016
+NONE_HEARTBEAT = 1.0  # 손이 없는 동안 "none" 재전송 간격 (초)
+
+SMOOTH_MIN_CUTOFF = 1.0
+SMOOTH_BETA = 5.0
+HAND_SLOTS = {"Right": 0, "Left": 1}
+
+log = logging.getLogger("gesture_hud")
+
+
+# --- Gesture recognization function ---
+def extract_landmarks(hand_landmarks, out=None):
+    # MediaPipe 결과 -> (21, 3) float32 배열 (반올림은 직렬화 시점에만)
+    return landmarks_to_array(hand_landmarks, out)
+
+
+def _anchor_xy(points, anchor):
+    if points.ndim == 2:
+        return rounded_xy(points, anchor)
+    # 양손 규칙은 두 손 anchor 의 중점
+    return round(float(points[:, anchor, 0].mean()), 5), round(float(points[:, anchor, 1].mean()), 5)
+
+
+# --- function End ---
+
+
+class GestureEvent:
+    """GestureEngine.process() 의 결과. 보낼 메시지 하나에 해당한다."""
+
+    __slots__ = ("key", "payload", "timestamp", "hand", "points", "source", "phase")
+
+    def __init__(self, key, payload, timestamp, hand=None, points=None, source=None, phase=None):
+        self.key = key
+        self.payload = payload
+        self.timestamp = timestamp
+        self.hand = hand  # "Right" / "Left" / None
+        self.points = points  # 제스처를 만든 손의 (21, 3) 랜드마크
+        self.source = source  # 카메라 번호 (multi_camera.py), 단일 카메라면 None
+        self.phase = phase  # "start" / "update" / "end" (GestureStateMachine), 프레임별 전송이면 None
+
+    @property
+    def coalesce_key(self):
+        # 전송 큐에서 update 만 최신 값으로 덮어쓰고 start / end 는 손마다 하나씩 남긴다
+        if self.phase is None:
+            return self.key
+        return f"{self.hand}:{self.key}:{self.phase}"
+
+    def to_json(self):
+        if self.source is None and self.phase is None:
+            return json.dumps({self.key: self.payload})
+        payload = dict(self.payload)
+        if self.source is not None:
+            payload["source"] = self.source
+        if self.phase is not None:
+            payload["phase"] = self.phase
+        return json.dumps({self.key: payload})
+
+    def to_binary(self, include_landmarks=False):
+        landmarks = self.points if include_landmarks else None
+        return encode_gesture(self.key, self.payload, self.timestamp, HAND_IDS.get(self.hand, HAND_NONE), landmarks,
+                              self.source, self.phase)
+
+    def encode(self, binary=False, include_landmarks=False):
+        if binary or include_landmarks:
+            return self.to_binary(include_landmarks)
+        return self.to_json()
+
+    def __repr__(self):
+        return (f"GestureEvent({self.key!r}, {self.payload!r}, {self.timestamp!r}, hand={self.hand!r}, "
+                f"source={self.source!r}, phase={self.phase!r})")
+
+
+class GestureEngine:
+    """프레임 하나를 받아 보낼 GestureEvent 를 결정한다.
+
+    카메라/전송과 분리되어 있어서 MediaPipe 없이 랜드마크 배열만으로도
+    호출할 수 있다 (벤치마크, 테스트, 임베딩용).
+    """
+
+    def __init__(self, detector=None, rules=None, throttle_interval=THROTTLE_INTERVAL, smooth=False, max_hands=2,
+                 none_heartbeat=NONE_HEARTBEAT, debounce=None, predict=None, identity=True, profile=None):
+        self.detector = detector  # 이미지 -> MediaPipe 결과 (이미지를 넘길 때만 필요)
+        # 사용자 프로필 (calibration.py): 이름, 경로 또는 dict. 손 크기 비율과 임계값을 덮어쓴다
+        if isinstance(profile, str):
+            profile = load_profile(profile)
+        # 제스처 규칙 (gestures.json 경로 또는 RuleFile). 파일이 바뀌면 다음 프레임부터 반영
+        self.rules = rules if isinstance(rules, RuleFile) else RuleFile(rules or DEFAULT_RULES, profile=profile)
+        self.throttle_interval = throttle_interval
+        self.none_heartbeat = none_heartbeat  # 0 이면 손이 없는 프레임마다 "none" 전송
+
+        self.landmarks = LandmarkBuffer(max_hands)
+        # MediaPipe 라벨 스왑이 있어도 같은 손은 같은 라벨 (손별 필터 / 상태가 유지되도록)
+        self.identity = HandIdentity() if identity else None
+        # 손 크기는 매 프레임 새로 재지 않고 손마다 천천히 따라가는 값을 쓴다
+        self.scale = HandScale(max_hands=max_hands)
+        self.smoother = OneEuroFilter(SMOOTH_MIN_CUTOFF, SMOOTH_BETA, max_hands=max_hands) if smooth else None
+        # predict 초 뒤 위치를 payload 의 px / py 로 함께 보낸다 (x / y 는 그대로 현재 위치)
+        self.predictor = LandmarkPredictor(predict, max_hands=max_hands) if predict else None
+        self.last_result = None
+        self.throttled_frames = 0  # 스로틀 때문에 보내지 않은 프레임 수
+
+        # debounce 를 주면 손마다 start / update / end 이벤트만 보낸다 (None 이면 프레임별 전송)
+        self.states = None
+        if debounce is not None:
+            self.states = GestureStateMachine(self._event, debounce, throttle_interval)
+        self.reset()
+
+    @property
+    def throttled(self):
+        """스로틀 때문에 보내지 않은 수. 프레임별 전송이면 프레임, debounce 모드면 update_interval 에 걸린 update"""
+        return self.throttled_frames + (self.states.suppressed if self.states is not None else 0)
+
+    def reset(self):
+        self.last_send_time = 0
+        self.last_none_time = float("-inf")
+        self.current_gesture_state = "none"
+        self.previous_gesture = "none"  # 마지막으로 보낸 제스처
+        self.hand_gestures = {}  # 손마다 (양손 제스처는 None) 직전 판정, 히스테리시스용
+        if self.states is not None:
+            self.states.reset()
+        self.scale.reset()
+        if self.smoother is not None:
+            self.smoother.reset()
+        if self.predictor is not None:
+            self.predictor.reset()
+
+    def process(self, frame_or_landmarks, timestamp):
+        """frame_or_landmarks 는 다음 중 하나:
+
+        - MediaPipe Hands 결과 (multi_hand_landmarks / multi_handedness)
+        - 이미지 (detector 필요, detector 가 받는 색 순서 그대로)
+        - [(hand_label, (21, 3) 배열), ...]
+
+        이번 프레임에 보낼 GestureEvent 목록을 반환한다 (스로틀 등으로 없으면 빈 목록).
+        """
+        has_hands = self._fill(frame_or_landmarks, timestamp)
+        if self.states is not None:
+            return self._process_states(timestamp, has_hands)
+
+        event = self._process_hands(timestamp) if has_hands else self._process_no_hands(timestamp)
+        return [] if event is None else [event]
+
+    def _fill(self, source, timestamp):
+        if isinstance(source, np.ndarray) and source.dtype == np.uint8 and source.ndim == 3:
+            if self.detector is None:
+                raise ValueError("GestureEngine needs a detector to process image frames")
+            source = self.detector(source)
+
+        if hasattr(source, "multi_hand_landmarks"):
+            self.last_result = source
+            count = self.landmarks.fill(source)
+        else:
+            self.last_result = None
+            count = self.landmarks.fill_arrays(source if source is not None else ())
+
+        if count and self.identity is not None:
+            self.identity.assign(self.landmarks.labels, self.landmarks.hands, timestamp)
+        return count
+
+    @staticmethod
+    def _hand_ids(labels):
+        hand_ids = [HAND_SLOTS.get(label, i) for i, label in enumerate(labels)]
+        if len(set(hand_ids)) != len(hand_ids):
+            return None
+        return hand_ids
+
+    def _smooth(self, points, labels, timestamp):
+        if self.smoother is None:
+            return points
+        return self.smoother.filter(points, timestamp, self._hand_ids(labels))
+
+    def _predict(self, points, labels, timestamp):
+        if self.predictor is None:
+            return None
+        return self.predictor.predict(points, timestamp, self._hand_ids(labels))
+
+    def _reset_filters(self):
+        self.scale.reset()
+        if self.smoother is not None:
+            self.smoother.reset()
+        if self.predictor is not None:
+            self.predictor.reset()
+
+    def _hand_order(self, plan, labels):
+        # hand_priority 순서 (목록에 없는 손은 뒤로)
+        rank = {label: i for i, label in enumerate(plan.hand_priority)}
+        return sorted(range(len(labels)), key=lambda i: rank.get(labels[i], len(rank)))
+
+    @staticmethod
+    def _payload(rule, gesturekey, points, values, predicted=None):
+        """points / predicted: 손 하나면 (21, 3), 양손 규칙이면 (2, 21, 3)"""
+        payload = {"action": gesturekey, "x": 0.0, "y": 0.0}
+        if rule is None:
+            return payload
+        if rule.anchor is not None:
+            payload["x"], payload["y"] = _anchor_xy(points, rule.anchor)
+            if predicted is not None:
+                payload["px"], payload["py"] = _anchor_xy(predicted, rule.anchor)
+        if rule.dist is not None:
+            payload["current_dist"] = round(values[rule.dist], 5)
+        return payload
+
+    def _event(self, key, payload, timestamp, hand, points, phase):
+        if payload is None:
+            payload = {"action": key}
+        # 버퍼는 다음 프레임에 재사용되므로 복사해 둔다
+        return GestureEvent(key, payload, timestamp, hand, None if points is None else points.copy(), phase=phase)
+
+    def _features(self, current_time):
+        buffer = self.landmarks
+        plan = self.rules.poll(current_time)
+
+        labels = buffer.labels[:buffer.count]
+        points = self._smooth(buffer.hands, labels, current_time)
+        predicted = self._predict(points, labels, current_time)
+        hand_ids = self._hand_ids(labels)
+        features = plan.features(points, labels, lambda size: self.scale.update(size, current_time, hand_ids))
+
+        # 디버깅용 출력 (--log-level DEBUG)
+        if log.isEnabledFor(logging.DEBUG):
+            for hand_label, hand_values in zip(labels, features):
+                log.debug("Features [%s] - %s", hand_label, plan.describe(hand_values))
+        return plan, labels, points, predicted, features
+
+    def _process_states(self, current_time, has_hands):
+        states = self.states
+        events = []
+
+        if not has_hands:
+            self._reset_filters()
+            states.release((), current_time, events)
+            # 아무 제스처도 없으면 heartbeat 간격으로만 none
+            if not states.active and not events and current_time - self.last_none_time >= self.none_heartbeat:
+                self.last_none_time = current_time
+                events.append(GestureEvent("none", {"action": "none"}, current_time))
+            return events
+
+        plan, labels, points, predicted, features = self._features(current_time)
+        states.continuous = plan.continuous
+
+        rows = features.tolist()
+        pair_rule = None
+        if len(points) == 2 and plan.pair_rules:
+            pair_rule = plan.recognize_pair(rows, states.gesture(None))
+            if pair_rule is not None:
+                payload = self._payload(pair_rule, pair_rule.name, points, rows[0], predicted)
+                states.step(None, pair_rule.name, payload, None, current_time, events)
+                labels = ()  # 양손 제스처 중에는 손별 제스처를 끝낸다
+
+        seen = {None} if pair_rule is not None else set()
+        for i, hand_label in enumerate(labels):
+            values = rows[i]
+            rule, gesturekey = plan.recognize(hand_label, values, states.gesture(hand_label))
+            payload = self._payload(rule, gesturekey, points[i], values, None if predicted is None else predicted[i])
+            states.step(hand_label, gesturekey, payload, points[i], current_time, events)
+            seen.add(hand_label)
+        states.release(seen, current_time, events)
+        self.last_none_time = current_time
+        return events
+
+    def _process_hands(self, current_time):
+        plan, labels, points, predicted, features = self._features(current_time)
+
+        gesturekey = "none"
+        rule = None
+        values = None
+        action_hand = None
+        action_points = None
+        action_predicted = predicted
+
+        rows = features.tolist()
+        previous = self.hand_gestures
+
+        # 양손 규칙이 우선
+        if len(points) == 2 and plan.pair_rules:
+            rule = plan.recognize_pair(rows, previous.get(None, "none"))
+            if rule is not None:
+                gesturekey = rule.name
+                values = rows[0]
+        previous[None] = gesturekey
+
+        # 손마다 자기 히스테리시스 상태로 한 번씩 판정하고 hand_priority 가 높은 손의 제스처를 보낸다.
+        # 양손 제스처 중에는 손별 제스처를 끝낸다
+        for i in self._hand_order(plan, labels):
+            if gesturekey != "none" and action_hand is None:
+                previous[labels[i]] = "none"
+                continue
+            hand_rule, hand_key = plan.recognize(labels[i], rows[i], previous.get(labels[i], "none"))
+            previous[labels[i]] = hand_key
+            if hand_rule is not None and rule is None:
+                rule, gesturekey, values = hand_rule, hand_key, rows[i]
+                action_hand = labels[i]
+                action_points = points[i]
+                if predicted is not None:
+                    action_predicted = predicted[i]
+
+        action_payload = self._payload(rule, gesturekey, points if action_points is None else action_points, values,
+                                       action_predicted)
+        self.current_gesture_state = gesturekey
+
+        # 손이 보이는 동안의 none 은 보내지 않는다 (손이 사라질 때 _process_no_hands 에서 전송)
+        if gesturekey == "none":
+            return None
+
+        if (current_time - self.last_send_time) >= self.throttle_interval:
+            self.last_send_time = current_time
+            self.previous_gesture = gesturekey
+            self.current_gesture_state = gesturekey
+            # 버퍼는 다음 프레임에 재사용되므로 복사해 둔다
+            if action_points is not None:
+                action_points = action_points.copy()
+            return GestureEvent(gesturekey, action_payload, current_time, action_hand, action_points)
+
+        self.throttled_frames += 1
+        return None
+
+    def _process_no_hands(self, current_time):
+        transition = self.previous_gesture != "none"
+        if self.current_gesture_state != "none":
+            log.info("---All gestures done! (No hands)---")
+            transition = True
+            self.current_gesture_state = "none"
+            self.previous_gesture = "none"
+        self.hand_gestures.clear()
+
+        self._reset_filters()
+
+        # 전환 시점에는 바로, 그 뒤로는 heartbeat 간격으로만 보낸다
+        if not transition and current_time - self.last_none_time < self.none_heartbeat:
+            return None
+        self.last_none_time = current_time
+        return GestureEvent("none", {"action": "none"}, current_time)
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import operator
+import os
+
+import numpy as np
+
+from wire_format import GESTURES
+
+log = logging.getLogger("gesture_hud")
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# 특징 종류
+#   distance: [a, b]       손 하나의 랜드마크 a-b xy 거리
+#   mean:     [f, ...]     다른 특징들의 평균
+#   ratio:    [f, g]       f / g
+#   scale:    [f, ...]     손 크기 추정값. 다른 특징들 (손가락을 굽혀도 안 변하는 손바닥 거리) 의 평균 x open_ratio
+#                          를 GestureEngine 이 손마다 천천히 따라간다 (calibration.HandScale). 규칙 파일에 하나만
+#   between:  [a, b]       첫 번째 손의 a 와 두 번째 손의 b 사이 xy 거리 (양손 규칙용)
+#   angle:    [a, b]       두 번째 손의 b 에서 첫 번째 손의 a 로 가는 방향 (도, 양손 규칙용)
+# 양손 특징의 첫 번째 / 두 번째 손은 hand_priority 순서 (기본: Right, Left)
+FEATURE_KINDS = ("distance", "mean", "ratio", "scale", "between", "angle")
+PAIR_KINDS = ("between", "angle")
+
+
+class RuleError(ValueError):
+    pass
+
+
+class Rule:
+    __slots__ = ("name", "outputs", "conditions", "anchor", "dist")
+
+    def __init__(self, name, outputs, conditions, anchor, dist):
+        self.name = name
+        self.outputs = outputs  # hand label -> 보낼 제스처 키 (양손 규칙은 {None: name})
+        self.conditions = conditions  # [(특징 index, op, 임계값, 유지 중 임계값), ...]
+        self.anchor = anchor  # x/y 로 보낼 랜드마크 index (None 이면 0.0)
+        self.dist = dist  # current_dist 로 보낼 특징 index (None 이면 생략)
+
+    def matches(self, values, active):
+        for index, op, threshold, sticky in self.conditions:
+            if not op(values[index], sticky if active else threshold):
+                return False
+        return True
+
+
+class RulePlan:
+    """gestures.json 을 한 번 컴파일한 평가 계획.
+
+    필요한 랜드마크 쌍 거리는 einsum 한 번으로 모든 손에 대해 계산하고,
+    파생 특징은 의존 순서대로 한 번씩만 계산한다. 규칙이 쓰지 않는 특징은 계산하지 않는다.
+    """
+
+    def __init__(self, config, profile=None):
+        specs = config.get("features", {})
+        self.hand_priority = list(config.get("hand_priority", ["Right", "Left"]))
+        # 사용자 프로필 (calibration.py) 이 있으면 손 크기 비율과 임계값을 덮어쓴다
+        profile = profile or {}
+        self.user = profile.get("user")
+        self._overrides = profile.get("thresholds", {})
+
+        gestures = [g for g in config.get("gestures", []) if g.get("enabled", True)]
+        require = config.get("require", [])
+
+        # 규칙이 참조하는 특징과 그 의존성만 모은다
+        self.names = []
+        self._index = {}
+        for name in _referenced(gestures, require):
+            self._add(name, specs, ())
+
+        # 손 하나짜리 거리 쌍 -> einsum 한 번
+        distance_names = [n for n in self.names if "distance" in specs[n]]
+        self.pair_a = np.array([specs[n]["distance"][0] for n in distance_names], dtype=np.intp)
+        self.pair_b = np.array([specs[n]["distance"][1] for n in distance_names], dtype=np.intp)
+        self.distance_columns = np.array([self._index[n] for n in distance_names], dtype=np.intp)
+
+        self.derived = []  # (out index, kind, arg indices), 의존 순서
+        self.open_ratio = None
+        for name in self.names:
+            spec = specs[name]
+            if "mean" in spec:
+                self.derived.append((self._index[name], "mean", np.array([self._index[f] for f in spec["mean"]])))
+            elif "ratio" in spec:
+                self.derived.append((self._index[name], "ratio", tuple(self._index[f] for f in spec["ratio"])))
+            elif "scale" in spec:
+                if self.open_ratio is not None:
+                    raise RuleError(f"feature {name!r}: only one scale feature is allowed")
+                self.open_ratio = float(profile.get("open_ratio", spec.get("open_ratio", 1.0)))
+                self.derived.append((self._index[name], "scale", np.array([self._index[f] for f in spec["scale"]])))
+
+        # 양손 특징 -> 두 손 사이 차이 벡터 한 번으로 거리 / 각도를 같이 계산
+        pair_names = [n for n in self.names if specs[n].keys() & set(PAIR_KINDS)]
+        pair_specs = [specs[n].get("between") or specs[n]["angle"] for n in pair_names]
+        self.pair_columns = np.array([self._index[n] for n in pair_names], dtype=np.intp)
+        self.pair_from = np.array([a for a, _ in pair_specs], dtype=np.intp)
+        self.pair_to = np.array([b for _, b in pair_specs], dtype=np.intp)
+        self.pair_angle = np.array(["angle" in specs[n] for n in pair_names], dtype=bool)
+        self._rank = {label: i for i, label in enumerate(self.hand_priority)}
+
+        # 위치가 계속 바뀌는 제스처 (GestureStateMachine 이 update 를 보낸다)
+        self.continuous = set()
+        for gesture in gestures:
+            if gesture.get("continuous"):
+                hands = gesture.get("hands", {"Right": gesture["name"]})
+                self.continuous.update([gesture["name"]] if hands == "both" else hands.values())
+
+        self.require = [self._condition(c, None) for c in require]
+        self.hand_rules = []
+        self.pair_rules = []
+        for gesture in gestures:
+            rule = self._rule(gesture)
+            (self.pair_rules if None in rule.outputs else self.hand_rules).append(rule)
+
+    def _add(self, name, specs, stack):
+        if name in self._index:
+            return
+        if name in stack:
+            raise RuleError(f"feature cycle: {' -> '.join(stack + (name,))}")
+        spec = specs.get(name)
+        if spec is None:
+            raise RuleError(f"unknown feature {name!r}")
+        if not spec.keys() & set(FEATURE_KINDS):
+            raise RuleError(f"feature {name!r} needs one of {', '.join(FEATURE_KINDS)}")
+        for dep in tuple(spec.get("mean", ())) + tuple(spec.get("ratio", ())) + tuple(spec.get("scale", ())):
+            self._add(dep, specs, stack + (name,))
+        self._index[name] = len(self.names)
+        self.names.append(name)
+
+    def _condition(self, condition, hysteresis, override=None):
+        name, op, threshold = condition
+        if op not in OPS:
+            raise RuleError(f"unknown operator {op!r}")
+        sticky = hysteresis.get(name, threshold) if hysteresis else threshold
+        if override and name in override:
+            threshold, sticky = override[name]
+        return self._index[name], OPS[op], float(threshold), float(sticky)
+
+    def _rule(self, gesture):
+        name = gesture["name"]
+        hands = gesture.get("hands", {"Right": name})
+        outputs = {None: name} if hands == "both" else dict(hands)
+        # 바이너리 프레임 (wire_format) 은 제스처 번호로 보내므로 거기 없는 이름은 컴파일할 때 거부한다
+        unknown = [key for key in outputs.values() if key not in GESTURES]
+        if unknown:
+            raise RuleError(f"gesture {name!r}: {', '.join(map(repr, unknown))} not in wire_format.GESTURES")
+        override = self._overrides.get(name)
+        conditions = [self._condition(c, gesture.get("hysteresis"), override) for c in gesture.get("when", [])]
+        dist = gesture.get("dist")
+        return Rule(name, outputs, conditions, gesture.get("anchor"), None if dist is None else self._index[dist])
+
+    def pair_order(self, labels):
+        """두 손의 (첫 번째, 두 번째) index (hand_priority 순서)"""
+        if labels is not None and self._rank.get(labels[1], len(self._rank)) < self._rank.get(labels[0], len(self._rank)):
+            return 1, 0
+        return 0, 1
+
+    def features(self, points, labels=None, scale=None):
+        """(hands, 21, 3) -> (hands, F) 특징 행렬. 양손 특징은 두 손일 때만 모든 행에 같은 값으로 채운다.
+
+        scale: 이번 프레임 손 크기 (hands,) -> 캐시된 손 크기 (hands,). 없으면 이번 프레임 값을 그대로 쓴다.
+        """
+        values = np.zeros((len(points), len(self.names)), dtype=np.float64)
+        if len(self.distance_columns):
+            diff = points[:, self.pair_a, :2] - points[:, self.pair_b, :2]
+            values[:, self.distance_columns] = np.sqrt(np.einsum("hij,hij->hi", diff, diff))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for out, kind, args in self.derived:
+                if kind == "mean":
+                    values[:, out] = values[:, args].mean(axis=1)
+                elif kind == "scale":
+                    size = values[:, args].mean(axis=1) * self.open_ratio
+                    values[:, out] = size if scale is None else scale(size)
+                else:
+                    values[:, out] = values[:, args[0]] / values[:, args[1]]
+
+        if len(points) == 2 and len(self.pair_columns):
+            first, second = self.pair_order(labels)
+            diff = points[first, self.pair_from, :2] - points[second, self.pair_to, :2]
+            dx, dy = diff[:, 0].astype(np.float64), diff[:, 1].astype(np.float64)
+            values[:, self.pair_columns] = np.where(self.pair_angle, np.degrees(np.arctan2(dy, dx)), np.hypot(dx, dy))
+        return values
+
+    def _required(self, values):
+        for index, op, threshold, _ in self.require:
+            if not op(values[index], threshold):
+                return False
+        return True
+
+    def recognize(self, label, values, previous_gesture):
+        """손 하나의 특징 값 (list) -> (맞은 Rule 또는 None, 제스처 키)"""
+        if not self._required(values):
+            return None, "none"
+        for rule in self.hand_rules:
+            output = rule.outputs.get(label)
+            # 히스테리시스는 같은 규칙이면 손에 상관없이 유지 (pinch <-> left_pinch)
+            if output is not None and rule.matches(values, previous_gesture in rule.outputs.values()):
+                return rule, output
+        return None, "none"
+
+    def recognize_pair(self, rows, previous_gesture):
+        """두 손의 특징 값 (list 두 개). 손 하나짜리 조건은 두 손 모두 만족해야 한다."""
+        if not all(self._required(values) for values in rows):
+            return None
+        for rule in self.pair_rules:
+            active = previous_gesture == rule.name
+            if all(rule.matches(values, active) for values in rows):
+                return rule
+        return None
+
+    def describe(self, values):
+        return ", ".join(f"{name}: {value:.3f}" for name, value in zip(self.names, values))
+
+
+def _referenced(gestures, require):
+    names = [c[0] for c in require]
+    for gesture in gestures:
+        names.extend(c[0] for c in gesture.get("when", []))
+        names.extend(gesture.get("hysteresis", {}))
+        if gesture.get("dist"):
+            names.append(gesture["dist"])
+    return list(dict.fromkeys(names))
+
+
+def load_rules(path=DEFAULT_RULES, profile=None):
+    with open(path, encoding="utf-8") as f:
+        return RulePlan(json.load(f), profile)
+
+
+class RuleFile:
+    """규칙 파일을 주기적으로 확인해서 바뀌면 다시 컴파일한다 (카메라 재시작 없이).
+
+    새 파일에 오류가 있으면 경고만 남기고 이전 계획을 계속 쓴다.
+    """
+
+    def __init__(self, path=DEFAULT_RULES, check_interval=1.0, profile=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.profile = profile  # 다시 읽을 때도 같은 사용자 프로필을 적용한다
+        self.reloads = 0
+        self._mtime = os.stat(path).st_mtime
+        self._last_check = 0.0
+        self.plan = load_rules(path, profile)
+
+    def poll(self, now):
+        if now - self._last_check < self.check_interval:
+            return self.plan
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return self.plan
+        if mtime == self._mtime:
+            return self.plan
+
+        self._mtime = mtime
+        try:
+            self.plan = load_rules(self.path, self.profile)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            log.warning("%s: keeping previous gesture rules (%s)", self.path, e)
+            return self.plan
+
+        self.reloads += 1
+        log.info("✓ gesture rules reloaded from %s", self.path)
+        return self.plan
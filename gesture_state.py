@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from wire_format import PHASE_END, PHASE_START, PHASE_UPDATE
+
+DEBOUNCE = 0.04  # 새 제스처가 이 시간(초) 동안 유지돼야 전환
+
+
+class HandState:
+    __slots__ = ("gesture", "candidate", "since", "payload", "last_update")
+
+    def __init__(self):
+        self.gesture = "none"  # 확정된 제스처
+        self.candidate = None  # 전환 대기 중인 제스처
+        self.since = 0.0
+        self.payload = None  # 확정된 제스처의 마지막 payload (end 이벤트용)
+        self.last_update = 0.0
+
+
+class GestureStateMachine:
+    """손마다 (양손 제스처는 hand=None) 확정된 제스처를 들고 start / update / end 이벤트를 만든다.
+
+    - 다른 제스처가 debounce 초 동안 이어져야 전환한다 (한 프레임짜리 오인식은 무시)
+    - continuous 에 있는 제스처 (pointer, drag, zoom) 만 update 를 update_interval 마다 보낸다
+    - 나머지 (pinch 등) 는 start / end 한 번씩만
+    """
+
+    def __init__(self, make_event, debounce=DEBOUNCE, update_interval=0.016, continuous=()):
+        self.make_event = make_event  # (key, payload, timestamp, hand, points, phase) -> 이벤트
+        self.debounce = debounce
+        self.update_interval = update_interval
+        self.continuous = set(continuous)
+        self.hands = {}
+        self.suppressed = 0  # update_interval 때문에 보내지 않은 update 수
+
+    def reset(self):
+        self.hands.clear()
+
+    def gesture(self, hand):
+        state = self.hands.get(hand)
+        return "none" if state is None else state.gesture
+
+    @property
+    def active(self):
+        return any(state.gesture != "none" for state in self.hands.values())
+
+    def step(self, hand, gesture, payload, points, timestamp, out):
+        state = self.hands.get(hand)
+        if state is None:
+            state = self.hands[hand] = HandState()
+
+        if gesture == state.gesture:
+            state.candidate = None
+            if gesture == "none":
+                return
+            state.payload = payload
+            if gesture in self.continuous:
+                if timestamp - state.last_update >= self.update_interval:
+                    state.last_update = timestamp
+                    out.append(self.make_event(gesture, payload, timestamp, hand, points, PHASE_UPDATE))
+                else:
+                    self.suppressed += 1
+            return
+
+        if gesture != state.candidate:
+            state.candidate = gesture
+            state.since = timestamp
+        if timestamp - state.since < self.debounce:
+            return
+
+        if state.gesture != "none":
+            out.append(self.make_event(state.gesture, state.payload, timestamp, hand, None, PHASE_END))
+        state.gesture = gesture
+        state.candidate = None
+        state.payload = payload
+        state.last_update = timestamp
+        if gesture != "none":
+            out.append(self.make_event(gesture, payload, timestamp, hand, points, PHASE_START))
+
+    def release(self, seen, timestamp, out):
+        """이번 프레임에 보이지 않은 손은 none 으로 처리"""
+        for hand in list(self.hands):
+            if hand not in seen:
+                self.step(hand, "none", None, None, timestamp, out)
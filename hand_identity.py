@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+
+PALM = [0, 5, 9, 13, 17]  # 손바닥 중심 (손가락을 움직여도 잘 안 변한다)
+MAX_JUMP = 0.2  # 프레임 사이 손바닥 중심 이동 허용 거리 (화면 비율). 넘으면 새 손으로 본다
+TIMEOUT = 0.5  # 이 시간(초) 동안 안 보인 손은 잊는다
+RELABEL_FRAMES = 15  # MediaPipe 라벨과 이만큼 연속으로 어긋나면 MediaPipe 쪽을 따른다
+
+
+class HandIdentity:
+    """MediaPipe handedness 라벨이 프레임마다 뒤바뀌어도 같은 손에는 같은 라벨을 유지한다.
+
+    직전 프레임 손바닥 중심과 가장 가까운 쪽으로 라벨을 배정하고, 처음 보는 손이나 너무 멀리
+    뛴 손만 MediaPipe 라벨을 그대로 쓴다. 두 손이 같은 라벨로 나와도 서로 다른 라벨이 된다.
+    OneEuroFilter / 예측기 / GestureStateMachine 의 손별 상태가 라벨 스왑으로 초기화되지 않게 한다.
+    """
+
+    def __init__(self, max_jump=MAX_JUMP, timeout=TIMEOUT, relabel_frames=RELABEL_FRAMES, slots=("Right", "Left")):
+        self.max_jump = max_jump
+        self.timeout = timeout
+        self.relabel_frames = relabel_frames
+        self.slots = slots
+        self.corrections = 0  # MediaPipe 라벨을 고친 손 수 (누적)
+        self._center = {}  # label -> 마지막 손바닥 중심 (x, y)
+        self._seen = {}  # label -> 마지막으로 본 시각
+        self._disagree = {}  # label -> MediaPipe 라벨과 연속으로 어긋난 프레임 수
+
+    def reset(self):
+        self._center.clear()
+        self._seen.clear()
+        self._disagree.clear()
+
+    def _cost(self, slot, center, detected):
+        previous = self._center.get(slot)
+        if previous is not None:
+            distance = float(np.hypot(center[0] - previous[0], center[1] - previous[1]))
+            if distance <= self.max_jump:
+                return distance
+        # 새 손: MediaPipe 라벨과 같은 쪽을 우선
+        return self.max_jump + (0.0 if slot == detected else self.max_jump)
+
+    def assign(self, labels, points, timestamp):
+        """labels (list) 의 앞 len(points) 개를 제자리에서 고친다. points: (hands, 21, 3)"""
+        for slot in [s for s, t in self._seen.items() if timestamp - t > self.timeout]:
+            del self._seen[slot], self._center[slot]
+            self._disagree.pop(slot, None)
+
+        count = len(points)
+        if count == 0 or count > len(self.slots):
+            return labels
+
+        centers = points[:, PALM, :2].mean(axis=1).tolist()
+        detected = labels[:count]
+        best = min(itertools.permutations(self.slots, count),
+                   key=lambda slots: sum(self._cost(s, c, d) for s, c, d in zip(slots, centers, detected)))
+        best = list(best)
+
+        for i, slot in enumerate(best):
+            if detected[i] in self.slots and detected[i] != slot:
+                self._disagree[slot] = self._disagree.get(slot, 0) + 1
+                # 손 하나만 보이는데 MediaPipe 가 계속 반대라고 하면 처음 배정이 틀렸던 것
+                if count == 1 and self._disagree[slot] >= self.relabel_frames:
+                    self._disagree.pop(slot)
+                    self._center.pop(slot, None)
+                    self._seen.pop(slot, None)
+                    best[i] = slot = detected[i]
+            else:
+                self._disagree[slot] = 0
+
+        for i, slot in enumerate(best):
+            if slot != labels[i]:
+                self.corrections += 1
+            labels[i] = slot
+            self._center[slot] = centers[i]
+            self._seen[slot] = timestamp
+        return labels
@@ -1,305 +1,442 @@
 # -*- coding: utf-8 -*-
-import math
-import cv2
-import mediapipe as mp
-import json
-import websocket
+import argparse
+import logging
 import time
-from mediapipe.tasks.python.components.containers.landmark import Landmark
 
+import numpy as np
+
+from calibration import load_profile
+from gesture_engine import GestureEngine
+from gesture_state import DEBOUNCE
+from landmark_stream import KEYFRAME_INTERVAL, LandmarkStreamEncoder
+from metrics import Metrics, MetricsServer
+from startup import WARMUP_RUNS, StartupTimer
+
+# cv2 / mediapipe 와 옵션에서만 쓰는 모듈은 쓰는 곳에서 import 한다.
+# 시작할 때 카메라 스레드가 cv2 를, 모델 스레드가 mediapipe 를 동시에 불러온다 (startup.py)
+
+log = logging.getLogger("gesture_hud")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gesture HUD hand tracker")
+    parser.add_argument("--camera", type=int, default=1, help="cv2.VideoCapture 카메라 번호")
+    parser.add_argument("--source", metavar="SPEC",
+                        help="카메라 대신 비디오 파일 / 이미지 디렉터리 / synthetic (capture.py)")
+    parser.add_argument("--loop", action="store_true", help="--source 파일이 끝나면 처음부터 다시")
+    parser.add_argument("--ring-size", type=int, metavar="N",
+                        help="미리 할당해 돌려 쓰는 프레임 버퍼 수 (기본: capture.RING_SIZE)")
+    parser.add_argument("--width", type=int, default=640, help="캡처 가로 해상도")
+    parser.add_argument("--height", type=int, default=480, help="캡처 세로 해상도")
+    parser.add_argument("--host", default="localhost", help="중계 서버 (MainServer/HeadlessServer) 호스트")
+    parser.add_argument("--port", type=int, default=8884, help="중계 서버 websocket 포트")
+    parser.add_argument("--relay", action="append", default=[], metavar="[SCREEN=]URL[,URL]",
+                        help="여러 중계 서버로 나눠 보냄 (relay_pool.py, 여러 번 지정). 쉼표 뒤 url 은 예비 서버")
+    parser.add_argument("--route", default="gesture", choices=["gesture", "screen"],
+                        help="--relay 분배 방식: 제스처 종류별로 한 곳 / 화면마다 전부")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="트래커가 직접 websocket 서버를 열어 구독자에게 전송 (ws_server.py)")
+    parser.add_argument("--no-relay", action="store_true", help="중계 서버로 보내지 않음 (--serve 와 함께)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="capture / inference / send 를 별도 스레드로 분리")
+    parser.add_argument("--smooth", action="store_true", help="랜드마크에 One-Euro 필터 적용")
+    parser.add_argument("--rules", metavar="PATH", help="제스처 규칙 파일 (기본: gestures.json, 실행 중 수정하면 다시 읽음)")
+    parser.add_argument("--profile", metavar="USER",
+                        help="사용자 보정 프로필 (calibration.py 로 만든 profiles/<USER>.json 또는 경로)")
+    parser.add_argument("--binary", action="store_true", help="JSON 대신 wire_format 바이너리 프레임 전송")
+    parser.add_argument("--binary-landmarks", action="store_true",
+                        help="바이너리 프레임에 21개 랜드마크 블록 포함 (--binary 포함)")
+    parser.add_argument("--landmark-stream", action="store_true",
+                        help="양손 21개 랜드마크를 16bit 양자화 + keyframe delta 로 매 프레임 전송 (landmark_stream.py)")
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL, metavar="N",
+                        help="--landmark-stream keyframe 주기 (프레임)")
+    parser.add_argument("--headless", action="store_true",
+                        help="랜드마크 그리기와 미리보기 창 없이 실행 (HeadlessServer 와 같은 서버용)")
+    parser.add_argument("--preview-every", type=int, default=10, metavar="N",
+                        help="헤드리스 미리보기를 N 프레임마다 한 번 갱신")
+    parser.add_argument("--preview-file", metavar="PATH", help="헤드리스 미리보기를 JPEG 파일로 저장")
+    parser.add_argument("--preview-port", type=int, metavar="PORT", help="헤드리스 미리보기 MJPEG 포트")
+    parser.add_argument("--dummy", action="store_true", help="카메라 대신 빈 프레임 사용 (테스트용)")
+    parser.add_argument("--record", metavar="PATH", help="프레임별 랜드마크를 기록 (landmark_log.py 로 재생)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG 에서만 프레임별 비율/메시지 출력")
+    parser.add_argument("--roi", action="store_true",
+                        help="직전 손 주변만 잘라서 추론 (주기적으로 전체 프레임 검출)")
+    parser.add_argument("--roi-full-every", type=int, default=30, metavar="N",
+                        help="--roi 사용 시 N 프레임마다 전체 프레임 검출")
+    parser.add_argument("--idle-gate", action="store_true",
+                        help="손이 없고 화면이 정지해 있으면 추론을 건너뜀")
+    parser.add_argument("--idle-threshold", type=float, default=4.0,
+                        help="--idle-gate 움직임 판정 기준 (축소 흑백 이미지의 평균 밝기 차이)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, metavar="SEC",
+                        help="제스처가 SEC 초 동안 유지돼야 전환 (start / update / end 이벤트 전송)")
+    parser.add_argument("--per-frame", action="store_true",
+                        help="이벤트 대신 예전처럼 스로틀된 프레임마다 현재 제스처 전송")
+    parser.add_argument("--predict", type=float, default=0, metavar="SEC",
+                        help="SEC 초 뒤 예측 위치를 px / py 로 함께 전송 (0 이면 끔, landmark_predictor.py 로 튜닝)")
+    parser.add_argument("--none-heartbeat", type=float, default=1.0, metavar="SEC",
+                        help="손이 없을 때 none 재전송 간격 (0 이면 매 프레임)")
+    parser.add_argument("--warmup", type=int, default=WARMUP_RUNS, metavar="N",
+                        help="첫 프레임 전에 빈 프레임으로 추론을 N 번 돌려 둔다 (0 이면 끔)")
+    parser.add_argument("--sequential-startup", action="store_true",
+                        help="카메라 / 모델 / 서버를 차례로 연다 (시작 시간 비교용)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="Prometheus /metrics 포트")
+    parser.add_argument("--metrics-interval", type=float, default=0, metavar="SEC",
+                        help="SEC 초마다 지연 시간/카운터 요약 한 줄 출력 (0 이면 끔)")
+    return parser.parse_args(argv)
+
+
+def open_capture(args):
+    from capture import RING_SIZE, CameraSource, Capture, open_source
+
+    spec = "dummy" if args.dummy else (args.source or args.camera)
+    cap = Capture(open_source(spec, args.width, args.height, loop=args.loop), ring_size=args.ring_size or RING_SIZE)
+    if isinstance(cap.source, CameraSource):
+        # 첫 프레임은 드라이버가 스트림을 켜느라 느리다. 모델을 불러오는 동안 미리 받아 둔다
+        cap.read()
+    return cap
+
+
+def create_hands():
+    import mediapipe as mp
+
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+
+
+def run_inference(hands, frame):
+    # Capture 프레임은 이미 좌우 반전된 RGB. ROI crop 만 연속 메모리로 복사된다
+    return hands.process(np.ascontiguousarray(frame))
+
+
+def reset_tracking(hands):
+    # video mode 추적 상태 (직전 손 위치) 를 버린다. reset 이 없는 MediaPipe 버전은 그대로 둔다
+    if hasattr(hands, "reset"):
+        hands.reset()
+
+
+def warm_up(hands, shape, runs=WARMUP_RUNS):
+    """빈 프레임으로 추론을 미리 돌려 둔다. 첫 process 호출의 그래프 초기화 / 메모리 할당이 여기서 끝난다.
+
+    빈 프레임에서는 손이 안 나오므로 손바닥 검출 경로만 데워지고, 추적 상태는 남지 않는다.
+    """
+    blank = np.zeros(shape, dtype=np.uint8)
+    for _ in range(runs):
+        run_inference(hands, blank)
+
+
+def draw_hands(frame, result):
+    if result.multi_hand_landmarks:
+        from mediapipe import solutions
+
+        for hand_landmarks in result.multi_hand_landmarks:
+            solutions.drawing_utils.draw_landmarks(
+                frame,
+                hand_landmarks,
+                solutions.hands.HAND_CONNECTIONS
+            )
+
+
+def draw_and_show(frame, result, out=None):
+    import cv2
+
+    from capture import to_bgr
+
+    image = to_bgr(frame, out)
+    draw_hands(image, result)
+
+    cv2.imshow('Hand Tracking', image)
+
+    return cv2.waitKey(1) & 0xFF == 27
+
+
+class Tracker:
+    """카메라 -> GestureEngine -> 전송을 묶는 실행 루프. capture / transport 는 교체 가능."""
+
+    def __init__(self, engine, cap, transport, hands, headless=False, preview=None,
+                 binary=False, binary_landmarks=False, recorder=None, metrics=None, roi=None,
+                 gate=None, server=None, stream=None, startup=None, crop_hands=None):
+        self.engine = engine
+        self.cap = cap
+        self.transport = transport  # send(data, key) 를 가진 객체 (예: WebSocketSender), 없으면 None
+        self.hands = hands
+        self.headless = headless
+        self.preview = preview
+        self.binary = binary
+        self.binary_landmarks = binary_landmarks
+        self.recorder = recorder
+        self.metrics = metrics
+        self.roi = roi  # RoiScheduler (None 이면 항상 전체 프레임)
+        self.crop_hands = crop_hands  # ROI crop 전용 Hands (전체 프레임과 추적 상태를 섞지 않는다)
+        self.gate = gate  # MotionGate (None 이면 매 프레임 추론)
+        self.server = server  # GestureServer (구독자별로 직접 인코딩해서 보낸다)
+        self.stream = stream  # LandmarkStreamEncoder (None 이면 랜드마크 스트림 안 보냄)
+        self.startup = startup  # StartupTimer, 첫 제스처를 기록하면 None
+        self.last_key = "none"
+        self._display = None  # 미리보기 창용 BGR 버퍼
+
+    def send_event(self, event):
+        # 논블로킹: 연결이 끊겨 있어도 트래킹 루프는 멈추지 않는다
+        if self.transport is not None:
+            data = event.encode(self.binary, self.binary_landmarks)
+            self.transport.send(data, event.coalesce_key, event.timestamp)
+            log.debug("%s", data)
+        if self.server is not None:
+            self.server.publish(event)
+
+        if event.key != self.last_key:
+            if self.metrics is not None:
+                self.metrics.inc("gesture_transitions_total", labels=(("from", self.last_key), ("to", event.key)))
+            self.last_key = event.key
+
+    def send_landmarks(self, frame):
+        if frame is None:
+            return
+        data, has_key, timestamp = frame
+        # keyframe 은 delta 에 덮어써지지 않도록 키를 나눈다. keyframe 이 든 프레임에는 모든 손의 keyframe 이 있으므로
+        # (LandmarkStreamEncoder) 새 keyframe 프레임이 밀린 keyframe 프레임을 덮어써도 복원할 수 있다
+        key = "landmarks:key" if has_key else "landmarks:delta"
+        if self.transport is not None:
+            self.transport.send(data, key, timestamp)
+        if self.server is not None:
+            self.server.publish_landmarks(key, data)
+
+    def infer(self, frame, timestamp):
+        if self.gate is not None and not self.gate.should_infer(frame, self.engine.landmarks.count > 0, timestamp):
+            from motion_gate import NO_HANDS
+
+            if self.metrics is not None:
+                self.metrics.inc("frames_skipped_total")
+            return NO_HANDS
+
+        start = time.perf_counter()
+        if self.roi is not None:
+            result = self.roi.process(frame, lambda image: run_inference(self.hands, image),
+                                      lambda image: run_inference(self.crop_hands, image),
+                                      lambda: reset_tracking(self.crop_hands))
+        else:
+            result = run_inference(self.hands, frame)
+        if self.metrics is not None:
+            self.metrics.observe("inference_seconds", time.perf_counter() - start)
+            self.metrics.inc("frames_total")
+        return result
+
+    def process(self, result, timestamp):
+        """-> (이벤트 목록, 랜드마크 스트림 프레임 또는 None)"""
+        events = self.engine.process(result, timestamp)
+        landmarks = self.engine.landmarks
+        if self.startup is not None:
+            self._startup_marks(events)
+        if self.recorder is not None:
+            self.recorder.record(landmarks, timestamp)
+
+        stream_frame = None
+        if self.stream is not None:
+            data, has_key = self.stream.encode(timestamp, list(zip(landmarks.labels, landmarks.hands)))
+            stream_frame = (data, has_key, timestamp)
+        return events, stream_frame
+
+    def _startup_marks(self, events):
+        startup = self.startup
+        startup.mark("first_frame")
+        if any(event.key != "none" for event in events):
+            startup.mark("first_gesture")
+            log.info("✓ first gesture %.0fms after launch", startup.marks["first_gesture"] * 1000)
+            self.startup = None
+
+    def display_frame(self, frame, result):
+        """True 를 반환하면 종료 (ESC). 헤드리스 모드에서는 창을 열지 않는다."""
+        if not self.headless:
+            if self._display is None or self._display.shape != frame.shape:
+                self._display = np.empty_like(frame)
+            return draw_and_show(frame, result, self._display)
+
+        if self.preview is not None:
+            self.preview.submit(frame, result)
+        return False
 
-def connect_websocket():
-    while True:
-        try:
-            ws = websocket.WebSocket()
-            ws.connect("ws://localhost:8884")
-            print("✓ WebSocket Connected")
-            return ws
-        except ConnectionRefusedError:
-            print("✗ Connection refused. Retrying in 2 seconds...")
-            time.sleep(2)
-        except Exception as e:
-            print(f"✗ Connection error: {e}. Retrying in 2 seconds...")
-            time.sleep(2)
-
-
-ws = connect_websocket()
-
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-
-cap = cv2.VideoCapture(1)
-
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-
-# --- Gesture recognization function ---
-def get_distance(p1, p2):
-    if p1 is None or p2 is None: return None
-    return math.sqrt((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2)
-
-
-def get_dict_distance(p1_dict, p2_dict):
-    if p1_dict is None or p2_dict is None: return None
-    return math.sqrt((p1_dict["x"] - p2_dict["x"]) ** 2 + (p1_dict["y"] - p2_dict["y"]) ** 2)
-
-
-def extract_landmarks(hand_landmarks, ids_to_extract):
-    landmarks_of_interest = {}
-    for tip_id in ids_to_extract:
-        landmarks = hand_landmarks.landmark[tip_id]
-        landmarks_of_interest[str(tip_id)] = {
-            'x': round(landmarks.x, 5),
-            'y': round(landmarks.y, 5),
-            'z': round(landmarks.z, 5)
-        }
-    return landmarks_of_interest
-
-
-# 개선된 손 크기 계산: 손목에서 각 손가락 끝까지 평균 거리
-def get_hand_size(landmarks_of_interest):
-    pos0 = landmarks_of_interest.get("0")  # 손목
-    finger_tips = ["8", "12", "16", "20"]  # 검지, 중지, 약지, 새끼 끝
-
-    if pos0 is None:
-        return None
-
-    distances = []
-    for tip_id in finger_tips:
-        tip_pos = landmarks_of_interest.get(tip_id)
-        if tip_pos:
-            dist = get_dict_distance(pos0, tip_pos)
-            if dist is not None:
-                distances.append(dist)
-
-    if len(distances) == 0:
-        return None
-
-    # 평균 거리 사용 (더 안정적)
-    avg_distance = sum(distances) / len(distances)
-    return avg_distance
-
-
-def recognize_single_hand_gesture(landmarks_of_interest, pinch_low, pinch_high, zoom_threshold,
-                                  pointer_ratio, previous_gesture):
-    # 손 크기 기준값 계산
-    hand_size = get_hand_size(landmarks_of_interest)
-    if hand_size is None or hand_size < 0.01:  # 너무 작으면 무시
-        return "none"
-
-    pos4 = landmarks_of_interest.get("4")
-    pos8 = landmarks_of_interest.get("8")
-    pos12 = landmarks_of_interest.get("12")
-    pos16 = landmarks_of_interest.get("16")
-    pos20 = landmarks_of_interest.get("20")
-
-    dist_4_8 = get_dict_distance(pos4, pos8)
-    dist_8_12 = get_dict_distance(pos8, pos12)
-    dist_12_16 = get_dict_distance(pos12, pos16)
-    dist_16_20 = get_dict_distance(pos16, pos20)
-
-    dist = [dist_4_8, dist_8_12, dist_12_16, dist_16_20]
-
-    if any(d is None for d in dist):
-        return "none"
-
-    # 비율로 변환 (거리 / 손 크기) - 정규화
-    ratio_4_8 = dist_4_8 / hand_size
-    ratio_8_12 = dist_8_12 / hand_size
-    ratio_12_16 = dist_12_16 / hand_size
-    ratio_16_20 = dist_16_20 / hand_size
-
-    # 디버깅용 출력
-    print(f"Ratios - 4_8: {ratio_4_8:.3f}, 8_12: {ratio_8_12:.3f}")
+    def run_sequential(self):
+        while self.cap.isOpened():
+            current_time = time.time()
 
-    # 히스테리시스를 적용한 핀치 제스처 판단
-    if previous_gesture == "pinch" or previous_gesture == "left_pinch":
-        # 이미 핀치 상태 → 더 큰 값에서만 해제 (pinch_high)
-        is_pinch = (ratio_4_8 < pinch_high) and (ratio_8_12 > pinch_low * 2.0)
-    else:
-        # 핀치 아닌 상태 → 더 작은 값에서만 진입 (pinch_low)
-        is_pinch = (ratio_4_8 < pinch_low) and (ratio_8_12 > pinch_low * 2.0)
+            frame = self.cap.read()
+            if frame is None:
+                break
 
-    if is_pinch:
-        return "pinch"
+            result = self.infer(frame, current_time)
 
-    # 핀치 줌 제스처 (히스테리시스 없이 단순하게)
-    if (ratio_16_20 < zoom_threshold) and (ratio_8_12 < pointer_ratio) and (ratio_12_16 > pointer_ratio * 1.2):
-        return "pinch_zoom"
+            events, stream_frame = self.process(result, current_time)
+            for event in events:
+                self.send_event(event)
+            self.send_landmarks(stream_frame)
 
-    return "pointer"
+            if self.display_frame(frame, result):
+                break
 
+    def run_pipelined(self):
+        # 엔진은 send 스레드에서 돌린다. send 가 밀려서 send_queue 가 버리는 것은 MediaPipe 결과 (프레임) 뿐이고,
+        # 한 번 만든 이벤트 (한 번만 가는 start / end 포함) 와 랜드마크 스트림 프레임은 버려지지 않는다
+        def infer(frame, t_capture):
+            return frame, self.infer(frame, t_capture), t_capture
 
-# --- function End ---
+        def send(output):
+            _, result, t_capture = output
+            events, stream_frame = self.process(result, t_capture)
+            for event in events:
+                self.send_event(event)
+            self.send_landmarks(stream_frame)
 
-# websocket connection function(Continuous connectivity)
-def safe_send(ws_connection, data):
-    try:
-        ws_connection.send(data)
-        return True
-    except (BrokenPipeError, ConnectionResetError, websocket.WebSocketConnectionClosedException) as e:
-        print(f"\n✗ WebSocket connect refused: {e}")
-        print("→ reconnection trying")
-        return False
-    except Exception as e:
-        print(f"\n✗ send err: {e}")
-        return False
+        from pipeline import Pipeline
 
+        pipeline = Pipeline(self.cap.read, infer, send)
+        pipeline.start()
 
-with mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=2,
-        min_detection_confidence=0.7,
-        min_tracking_confidence=0.7
-) as hands:
-    # 비율 기반 임계값 (정규화된 값)
-    PINCH_LOW = 0.25  # 핀치 진입: 손 크기의 25% 이하
-    PINCH_HIGH = 0.50  # 핀치 해제: 손 크기의 50% 이상
-    ZOOM_THRESHOLD = 0.22  # 줌: 손 크기의 22% 이하
-    POINTER_RATIO = 0.30  # 포인터 판단용
-
-    last_send_time = 0
-    THROTTLE_INTERVAL = 0.016
-
-    current_gesture_state = "none"
-    previous_gesture = "none"
-    gesturekey = ""
-
-    while cap.isOpened():
-        current_time = time.time()
-
-        success, frame = cap.read()
-        if not success:
-            break
-
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb)
-
-        current_global_action = "none"
-
-        action_payload = {
-            "action": "none", "x": 0.0, "y": 0.0, "current_dist": 0.0
-        }
-
-        if result.multi_hand_landmarks:
-            all_hands_data = []
-            tip_ids = [0, 4, 8, 12, 16, 20]  # 0번(손목) 추가
-
-            for hand_landmarks, handedness in zip(result.multi_hand_landmarks, result.multi_handedness):
-                hand_label = handedness.classification[0].label
-                landmarks_of_interest = extract_landmarks(hand_landmarks, tip_ids)
-
-                gesture = "none"
-
-                if hand_label == "Right":
-                    gesture = recognize_single_hand_gesture(landmarks_of_interest, PINCH_LOW, PINCH_HIGH,
-                                                            ZOOM_THRESHOLD, POINTER_RATIO, previous_gesture)
-
-                    if gesture == "pinch_zoom":
-                        current_dist = get_dict_distance(landmarks_of_interest.get("4"),
-                                                         landmarks_of_interest.get("8"))
-                        zoom_center = landmarks_of_interest.get("4")
-
-                        action_payload["action"] = "pinch_zoom"
-                        action_payload["current_dist"] = current_dist if current_dist is not None else 0.0
-                        action_payload["x"] = zoom_center["x"] if zoom_center else 0.0
-                        action_payload["y"] = zoom_center["y"] if zoom_center else 0.0
-
-                    elif gesture == "pinch":
-                        current_pinch_pos = landmarks_of_interest.get("4")
-                        action_payload["action"] = "pinch"
-                        if current_pinch_pos:
-                            action_payload["x"] = current_pinch_pos["x"]
-                            action_payload["y"] = current_pinch_pos["y"]
-
-                    elif gesture == "pointer":
-                        pointer_pos = landmarks_of_interest.get("8")
-                        action_payload["action"] = "pointer"
-                        if pointer_pos:
-                            action_payload["x"] = pointer_pos["x"]
-                            action_payload["y"] = pointer_pos["y"]
-
-                    else:
-                        action_payload["action"] = "none"
-
-                    current_gesture_state = gesture
-                    current_global_action = gesture
-
-                elif hand_label == "Left" and current_global_action == "none":
-                    gesture = recognize_single_hand_gesture(landmarks_of_interest, PINCH_LOW, PINCH_HIGH,
-                                                            ZOOM_THRESHOLD, POINTER_RATIO, previous_gesture)
-
-                    if gesture == "pinch":
-                        current_pinch_pos = landmarks_of_interest.get("4")
-                        action_payload["action"] = "left_pinch"
-                        if current_pinch_pos:
-                            action_payload["x"] = current_pinch_pos["x"]
-                            action_payload["y"] = current_pinch_pos["y"]
-
-                        current_gesture_state = "left_pinch"
-                        current_global_action = "left_pinch"
-                    else:
-                        # 왼손이 pinch가 아니면 명확히 none
-                        action_payload["action"] = "none"
-                        current_gesture_state = "none"
-                        current_global_action = "none"
-
-                mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS
-                )
-
-            # 최종 제스처 키 결정
-            if current_global_action != "none":
-                gesturekey = current_global_action
+        # imshow 는 메인 스레드에서만 호출
+        try:
+            while pipeline.running:
+                output = pipeline.results.get(timeout=0.1)
+                if output is None:
+                    continue
+                frame, result = output[:2]
+                if self.display_frame(frame, result):
+                    break
+        finally:
+            pipeline.stop()
+            print(pipeline.report())
+
+
+def main(argv=None):
+    startup = StartupTimer()
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    # 카메라 / 모델을 열기 전에 프로필 오류를 먼저 알린다
+    profile = load_profile(args.profile) if args.profile else None
+
+    metrics = Metrics()
+    metrics_server = MetricsServer(metrics, args.metrics_port).start() if args.metrics_port else None
+    metrics.add_collector(startup.collect)
+    if args.metrics_interval:
+        metrics.start_summary(args.metrics_interval)
+
+    def load_model():
+        hands = create_hands()
+        if args.warmup:
+            with startup.phase("warmup"):
+                warm_up(hands, (args.height, args.width, 3), args.warmup)
+        return hands
+
+    def connect_relay():
+        if args.relay:
+            from relay_pool import RelayPool
+
+            return RelayPool.from_specs(args.relay, args.route, metrics=metrics).start()
+        from ws_sender import WebSocketSender
+
+        return WebSocketSender(f"ws://{args.host}:{args.port}", metrics=metrics).start()
+
+    def start_server():
+        from ws_server import GestureServer
+
+        return GestureServer(port=args.serve, metrics=metrics).start()
+
+    # 카메라 / 모델 / 전송을 동시에 연다. 가장 느린 하나만큼만 기다린다
+    tasks = {"camera": lambda: open_capture(args), "model": load_model}
+    if not args.no_relay:
+        tasks["relay"] = connect_relay
+    if args.serve:
+        tasks["server"] = start_server
+    if args.roi:
+        tasks["roi_model"] = create_hands
+    ready = startup.run(tasks, parallel=not args.sequential_startup)
+    startup.mark("ready")
+    log.info("%s", startup.summary())
+    cap, hands = ready["camera"], ready["model"]
+    crop_hands = ready.get("roi_model")
+
+    sender = ready.get("relay")
+    if sender is not None:
+        metrics.add_collector(lambda: {f"ws_{name}_total": value for name, value in sender.stats.items()})
+
+    server = ready.get("server")
+    if server is not None:
+        metrics.add_collector(lambda: {"server_subscribers": len(server.subscribers),
+                                       "server_coalesced_total": server.stats["coalesced"]})
+
+    recorder = None
+    if args.record:
+        from landmark_log import LandmarkRecorder
+
+        recorder = LandmarkRecorder(args.record)
+
+    preview = None
+    if args.headless and (args.preview_file or args.preview_port):
+        from headless import FramePreview
+
+        preview = FramePreview(args.preview_every, args.preview_file, args.preview_port, draw=draw_hands, rgb=True)
+
+    roi = None
+    if args.roi:
+        from roi_scheduler import RoiScheduler
+
+        roi = RoiScheduler(full_every=args.roi_full_every)
+        metrics.add_collector(lambda: {f"roi_{name}_frames_total": value for name, value in roi.stats.items()})
+
+    gate = None
+    if args.idle_gate:
+        from motion_gate import MotionGate
+
+        gate = MotionGate(args.idle_threshold, rgb=True)
+
+    with hands:
+        engine = GestureEngine(rules=args.rules, smooth=args.smooth, none_heartbeat=args.none_heartbeat,
+                               debounce=None if args.per_frame else args.debounce, predict=args.predict,
+                               profile=profile)
+        metrics.add_collector(lambda: {"frames_throttled_total": engine.throttled})
+        tracker = Tracker(engine, cap, sender, hands, headless=args.headless, preview=preview,
+                          binary=args.binary, binary_landmarks=args.binary_landmarks, recorder=recorder,
+                          metrics=metrics, roi=roi, gate=gate, server=server,
+                          stream=LandmarkStreamEncoder(args.keyframe_interval) if args.landmark_stream else None,
+                          startup=startup, crop_hands=crop_hands)
+        try:
+            if args.pipeline:
+                tracker.run_pipelined()
             else:
-                gesturekey = current_gesture_state
-
-            # pinch_zoom이 아니면 current_dist 제거
-            if gesturekey != "pinch_zoom":
-                if "current_dist" in action_payload:
-                    del action_payload["current_dist"]
-
-            # 전송 로직 (이전 방식 복원)
-            is_none_message = (gesturekey == "none")
-
-            if is_none_message or (current_time - last_send_time) >= THROTTLE_INTERVAL:
-                if is_none_message and current_gesture_state == "none":
-                    pass
-                else:
-                    json_data = json.dumps({gesturekey: action_payload})
-
-                    if not safe_send(ws, json_data):
-                        ws.close()
-                        ws = connect_websocket()
-                        safe_send(ws, json_data)
-
-                    print(json_data)
-                    last_send_time = current_time
-                    previous_gesture = gesturekey
-                    current_gesture_state = gesturekey
-
-        else:
-            if current_gesture_state != "none":
-                print("---All gestures done! (No hands)---")
-                current_global_action = "none"
-                current_gesture_state = "none"
-                previous_gesture = "none"
-
-            json_data = json.dumps({"none": {"action": "none"}})
-            if not safe_send(ws, json_data):
-                ws.close()
-                ws = connect_websocket()
-                safe_send(ws, json_data)
-
-        cv2.imshow('Hand Tracking', frame)
-
-        if cv2.waitKey(1) & 0xFF == 27:
-            break
-
-cap.release()
-cv2.destroyAllWindows()
-ws.close()
+                tracker.run_sequential()
+        except KeyboardInterrupt:
+            # 헤드리스 모드는 ESC 대신 Ctrl+C 로 종료
+            pass
+
+    if crop_hands is not None:
+        crop_hands.close()
+    cap.release()
+    log.info("%s", cap.summary())
+    if recorder is not None:
+        recorder.close()
+        print(f"✓ {recorder.frames} frames recorded to {recorder.path}")
+    if preview is not None:
+        preview.close()
+    if not args.headless:
+        import cv2
+
+        cv2.destroyAllWindows()
+    if sender is not None:
+        sender.stop()
+        print(sender.summary())
+    if server is not None:
+        server.stop()
+        print(server.summary())
+    if roi is not None:
+        print(roi.summary())
+    metrics.stop()
+    if metrics_server is not None:
+        metrics_server.close()
+    print(metrics.summary_line())
+    print(startup.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# 헤드리스 Tracker 를 합성 영상 + 가짜 hands 로 몇 프레임 돌려 본다 (mediapipe / 카메라 / 창 없이)
+#   python -m pytest -q hand_tracking_headless_test.py
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from capture import Capture, SyntheticSource  # noqa: E402
+from gesture_engine import GestureEngine  # noqa: E402
+from hand_tracking import Tracker  # noqa: E402
+
+FRAMES = 20
+
+
+class FakeHands:
+    """hands.process 자리에 오른손 하나 (검지만 편 pointer 모양) 를 돌려준다"""
+
+    def __init__(self):
+        self.calls = 0
+        points = [(0.5, 0.8), (0.45, 0.75), (0.42, 0.7), (0.4, 0.66), (0.39, 0.62),
+                  (0.46, 0.62), (0.46, 0.52), (0.46, 0.45), (0.46, 0.38),
+                  (0.5, 0.62), (0.5, 0.6), (0.5, 0.64), (0.5, 0.66),
+                  (0.54, 0.63), (0.54, 0.61), (0.54, 0.65), (0.54, 0.67),
+                  (0.58, 0.65), (0.58, 0.63), (0.58, 0.66), (0.58, 0.68)]
+        self._landmarks = [types.SimpleNamespace(x=x, y=y, z=0.0) for x, y in points]
+
+    def process(self, image):
+        assert image.ndim == 3
+        self.calls += 1
+        return types.SimpleNamespace(
+            multi_hand_landmarks=[types.SimpleNamespace(landmark=[types.SimpleNamespace(x=lm.x, y=lm.y, z=lm.z)
+                                                                  for lm in self._landmarks])],
+            multi_handedness=[types.SimpleNamespace(
+                classification=[types.SimpleNamespace(label="Right", score=0.99)])])
+
+
+class ListTransport:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data, key=None, captured_at=None):
+        self.sent.append((key, data))
+
+
+@pytest.fixture
+def no_window(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("headless tracker opened a window")
+
+    monkeypatch.setattr(cv2, "imshow", fail)
+    monkeypatch.setattr(cv2, "waitKey", fail)
+    monkeypatch.setattr(cv2, "namedWindow", fail)
+
+
+def _tracker(fps=0):
+    cap = Capture(SyntheticSource(160, 120, frames=FRAMES, fps=fps))
+    return Tracker(GestureEngine(), cap, ListTransport(), FakeHands(), headless=True)
+
+
+def test_sequential_headless(no_window):
+    tracker = _tracker()
+    tracker.run_sequential()
+
+    assert tracker.hands.calls == FRAMES
+    assert tracker.transport.sent
+
+
+def test_pipelined_headless(no_window):
+    # 파이프라인은 소스가 끝나면 바로 멈추므로 카메라처럼 속도를 맞춰 읽는다
+    tracker = _tracker(fps=200)
+    tracker.run_pipelined()
+
+    assert 0 < tracker.hands.calls <= FRAMES
+    assert tracker.transport.sent
+
+
+def test_import_does_not_load_mediapipe_or_cv2():
+    # 시작 시간 단축 (startup.py): cv2 / mediapipe 는 쓰는 곳에서만 import 한다
+    code = "import sys, hand_tracking; sys.exit(bool({'cv2', 'mediapipe'} & set(sys.modules)))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+
+class MjpegServer:
+    """가장 최근 미리보기 프레임을 multipart/x-mixed-replace 로 스트리밍"""
+
+    def __init__(self, port):
+        self._jpeg = None
+        self._cond = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.end_headers()
+                try:
+                    while True:
+                        jpeg = server.wait_frame()
+                        if jpeg is None:
+                            break
+                        self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                        self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mjpeg", daemon=True)
+        self._closed = False
+
+    def start(self):
+        self._thread.start()
+        print(f"[MJPEG] http://localhost:{self._httpd.server_port} 에서 미리보기 제공 중...")
+        return self
+
+    def publish(self, jpeg):
+        with self._cond:
+            self._jpeg = jpeg
+            self._cond.notify_all()
+
+    def wait_frame(self):
+        with self._cond:
+            self._cond.wait(1.0)
+            return None if self._closed else self._jpeg
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FramePreview:
+    """헤드리스 모드의 저속 미리보기: N 프레임마다 한 번만 그리고 인코딩한다."""
+
+    def __init__(self, every=10, path=None, port=None, draw=None, rgb=False):
+        self.every = max(1, every)
+        self.path = path
+        self.draw = draw
+        self.rgb = rgb  # capture.Capture 프레임이면 True (인코딩 전에 BGR 로 바꾼다)
+        self.mjpeg = MjpegServer(port).start() if port else None
+        self._count = 0
+
+    def submit(self, frame, result):
+        self._count += 1
+        if self._count % self.every:
+            return
+
+        if self.rgb:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        if self.draw is not None:
+            self.draw(frame, result)
+        ok, jpeg = cv2.imencode(".jpg", frame)
+        if not ok:
+            return
+        jpeg = jpeg.tobytes()
+
+        if self.path:
+            # 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 임시 파일 후 교체
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(jpeg)
+            os.replace(tmp_path, self.path)
+        if self.mjpeg is not None:
+            self.mjpeg.publish(jpeg)
+
+    def close(self):
+        if self.mjpeg is not None:
+            self.mjpeg.close()
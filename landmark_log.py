@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import argparse
+import collections
+import json
+import struct
+import time
+
+import numpy as np
+
+from wire_format import HAND_IDS, HAND_NONE
+
+# 랜드마크 스트림 기록 파일 (append-only, length-prefixed)
+#
+#   file   : MAGIC + uint8 version
+#   record : uint32 길이 | float64 timestamp | uint8 손 개수 | 손마다 (uint8 hand id, float32[21 * 3])
+
+MAGIC = b"GHLM"
+VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sB")
+RECORD_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<dB")
+HAND_HEADER = struct.Struct("<B")
+POINTS_BYTES = 21 * 3 * 4
+
+HAND_LABELS = {hand_id: label for label, hand_id in HAND_IDS.items()}
+
+
+class LandmarkRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, timestamp, hands):
+        """hands: [(hand_label, (21, 3) 배열), ...] (손이 없으면 빈 목록)"""
+        body = [RECORD_HEADER.pack(timestamp, len(hands))]
+        for label, points in hands:
+            body.append(HAND_HEADER.pack(HAND_IDS.get(label, HAND_NONE)))
+            body.append(np.ascontiguousarray(points, dtype="<f4").tobytes())
+        body = b"".join(body)
+        self._file.write(RECORD_LENGTH.pack(len(body)) + body)
+        self.frames += 1
+
+    def record(self, buffer, timestamp):
+        # LandmarkBuffer 를 그대로 기록 (필터 적용 전 원본)
+        self.write(timestamp, list(zip(buffer.labels[:buffer.count], buffer.hands)))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(path):
+    """(timestamp, [(hand_label, (21, 3) float32 배열), ...]) 를 순서대로 돌려준다."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a landmark log (version {version})")
+
+    offset = FILE_HEADER.size
+    while offset + RECORD_LENGTH.size <= len(data):
+        (length,) = RECORD_LENGTH.unpack_from(data, offset)
+        offset += RECORD_LENGTH.size
+        if offset + length > len(data):
+            break  # 기록 중 끊긴 마지막 레코드는 무시
+
+        timestamp, count = RECORD_HEADER.unpack_from(data, offset)
+        pos = offset + RECORD_HEADER.size
+        hands = []
+        for _ in range(count):
+            (hand_id,) = HAND_HEADER.unpack_from(data, pos)
+            pos += HAND_HEADER.size
+            points = np.frombuffer(data, dtype="<f4", count=21 * 3, offset=pos).reshape(21, 3)
+            pos += POINTS_BYTES
+            hands.append((HAND_LABELS.get(hand_id), points))
+
+        yield timestamp, hands
+        offset += length
+
+
+def replay(path, engine, realtime=False, speed=1.0, on_event=None):
+    """기록된 랜드마크를 engine 에 다시 넣는다. realtime=False 면 최대 속도.
+
+    반환값: frames / events / elapsed / fps / latencies(초) / gestures(키별 횟수)
+    """
+    latencies = []
+    gestures = collections.Counter()
+    frames = 0
+    events = 0
+
+    first_ts = None
+    start = time.perf_counter()
+    for timestamp, hands in read_log(path):
+        if realtime:
+            if first_ts is None:
+                first_ts = timestamp
+            delay = (timestamp - first_ts) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.perf_counter()
+        frame_events = engine.process(hands, timestamp)
+        latencies.append(time.perf_counter() - t0)
+        frames += 1
+
+        for event in frame_events:
+            events += 1
+            gestures[event.key] += 1
+            if on_event is not None:
+                on_event(event)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "events": events,
+        "elapsed": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "latencies": latencies,
+        "gestures": dict(gestures),
+    }
+
+
+def main(argv=None):
+    from gesture_engine import GestureEngine
+    from gesture_state import DEBOUNCE
+
+    parser = argparse.ArgumentParser(description="기록된 랜드마크 스트림을 GestureEngine 으로 재생")
+    parser.add_argument("log", help="hand_tracking.py --record 로 만든 파일")
+    parser.add_argument("--realtime", action="store_true", help="기록된 타이밍대로 재생 (기본: 최대 속도)")
+    parser.add_argument("--speed", type=float, default=1.0, help="--realtime 재생 배속")
+    parser.add_argument("--smooth", action="store_true", help="One-Euro 필터 적용")
+    parser.add_argument("--rules", metavar="PATH", help="제스처 규칙 파일 (기본: gestures.json)")
+    parser.add_argument("--predict", type=float, default=0, metavar="SEC", help="예측 위치 px / py 포함")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, metavar="SEC", help="제스처 전환 debounce")
+    parser.add_argument("--per-frame", action="store_true", help="이벤트 대신 프레임마다 현재 제스처 (예전 방식)")
+    parser.add_argument("--dump", metavar="PATH", help="제스처 이벤트를 JSON lines 로 저장 (회귀 비교용)")
+    args = parser.parse_args(argv)
+
+    dump = open(args.dump, "w", encoding="utf-8") if args.dump else None
+
+    def on_event(event):
+        if dump is not None:
+            record = {"t": event.timestamp, "hand": event.hand, event.key: event.payload}
+            if event.phase is not None:
+                record["phase"] = event.phase
+            dump.write(json.dumps(record) + "\n")
+
+    engine = GestureEngine(rules=args.rules, smooth=args.smooth, debounce=None if args.per_frame else args.debounce,
+                           predict=args.predict)
+    stats = replay(args.log, engine, args.realtime, args.speed, on_event)
+
+    if dump is not None:
+        dump.close()
+
+    latencies = np.array(stats.pop("latencies")) * 1000.0
+    if len(latencies):
+        stats["latency_ms"] = {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+        }
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import argparse
+import collections
+import json
+import math
+
+import numpy as np
+
+from landmarks import INDEX_TIP
+
+HORIZON = 0.05  # 초. 카메라 + 추론 + 전송 지연 정도
+VELOCITY_CUTOFF = 4.0  # 속도 low-pass 차단 주파수 (Hz). 낮을수록 덜 튀고 더 늦다
+GAP = 0.25  # 이보다 오래 끊기면 새 트랙으로 본다 (평가용)
+
+
+# 등속 모델 예측기. 속도는 OneEuroFilter 의 미분 필터처럼 low-pass 한 뒤
+# 현재 위치 + 속도 * horizon 을 예측값으로 낸다. (손 x 랜드마크 x xyz) 를 한 번에 처리.
+class LandmarkPredictor:
+    def __init__(self, horizon=HORIZON, velocity_cutoff=VELOCITY_CUTOFF, max_hands=2):
+        self.horizon = horizon
+        self.velocity_cutoff = velocity_cutoff
+        self.max_hands = max_hands
+
+        self._x_prev = None
+        self._v = None
+        self._t_prev = np.zeros(max_hands, dtype=np.float64)
+        self._initialized = np.zeros(max_hands, dtype=bool)
+
+    def _ensure_state(self, point_shape):
+        if self._x_prev is None or self._x_prev.shape[1:] != point_shape:
+            self._x_prev = np.zeros((self.max_hands,) + point_shape, dtype=np.float32)
+            self._v = np.zeros_like(self._x_prev)
+            self._initialized[:] = False
+
+    def predict(self, x, t, hand_ids=None):
+        """x: (hands, landmarks, 3), t: 초 단위 timestamp -> horizon 초 뒤 예측 위치 (같은 모양)
+
+        hand_ids 는 OneEuroFilter.filter 와 같다. 처음 보는 손은 속도 0 (예측 = 현재 위치).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        ids = np.arange(x.shape[0]) if hand_ids is None else np.asarray(hand_ids, dtype=np.intp)
+        self._ensure_state(x.shape[1:])
+
+        lost = np.ones(self.max_hands, dtype=bool)
+        lost[ids] = False
+        self._initialized[lost] = False
+
+        fresh = ~self._initialized[ids]
+        te = t - self._t_prev[ids]
+        valid = ~fresh & (te > 0.0)
+
+        expand = (slice(None),) + (np.newaxis,) * (x.ndim - 1)
+        te_safe = np.where(valid, te, 1.0)
+        r = 2 * math.pi * self.velocity_cutoff * te_safe
+        a = (r / (r + 1.0))[expand]
+
+        v_prev = self._v[ids]
+        v_raw = (x - self._x_prev[ids]) / te_safe[expand]
+        v = np.where(valid[expand], a * v_raw + (1.0 - a) * v_prev, np.where(fresh[expand], 0.0, v_prev))
+
+        self._x_prev[ids] = x
+        self._v[ids] = v
+        self._t_prev[ids] = np.where(valid | fresh, t, self._t_prev[ids])
+        self._initialized[ids] = True
+
+        return (x + v * self.horizon).astype(np.float32)
+
+    def reset(self, hand_id=None):
+        if hand_id is None:
+            self._initialized[:] = False
+        else:
+            self._initialized[hand_id] = False
+
+
+def _tracks(path):
+    """기록 파일 -> {hand label: [(times, points), ...]} (GAP 보다 길게 끊기면 나눈다)"""
+    from landmark_log import read_log
+
+    tracks = collections.defaultdict(list)
+    current = {}
+    for timestamp, hands in read_log(path):
+        for label, points in hands:
+            segment = current.get(label)
+            if segment is None or timestamp - segment[0][-1] > GAP:
+                segment = current[label] = ([], [])
+                tracks[label].append(segment)
+            segment[0].append(timestamp)
+            segment[1].append(points)
+    return {label: [(np.array(t), np.stack(p)) for t, p in segments] for label, segments in tracks.items()}
+
+
+def prediction_errors(path, horizon, velocity_cutoff=VELOCITY_CUTOFF, landmark=None):
+    """기록된 세션에서 horizon 초 뒤 실제 위치와의 xy 오차 (예측, 예측 안 함) 를 돌려준다.
+
+    실제 위치는 앞뒤 기록 프레임을 선형 보간한다. landmark 를 주면 그 점만 평가.
+    """
+    predicted_errors = []
+    hold_errors = []
+    for segments in _tracks(path).values():
+        for times, points in segments:
+            predictor = LandmarkPredictor(horizon, velocity_cutoff, max_hands=1)
+            predicted = np.stack([predictor.predict(p[None], t)[0] for t, p in zip(times, points)])
+
+            target_t = times + horizon
+            j = np.searchsorted(times, target_t)
+            ok = j < len(times)
+            if not ok.any():
+                continue
+            j = j[ok]
+            w = ((target_t[ok] - times[j - 1]) / (times[j] - times[j - 1]))[:, None, None]
+            actual = points[j - 1] + (points[j] - points[j - 1]) * w
+
+            sel = slice(None) if landmark is None else [landmark]
+            predicted_errors.append(np.linalg.norm(predicted[ok][:, sel, :2] - actual[:, sel, :2], axis=-1).ravel())
+            hold_errors.append(np.linalg.norm(points[ok][:, sel, :2] - actual[:, sel, :2], axis=-1).ravel())
+
+    if not predicted_errors:
+        return None, None
+    return np.concatenate(predicted_errors), np.concatenate(hold_errors)
+
+
+def _summary(errors, width):
+    return {
+        "mean_px": float(errors.mean() * width),
+        "p95_px": float(np.percentile(errors, 95) * width),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 랜드마크 세션으로 예측 horizon 별 오차 측정")
+    parser.add_argument("log", help="hand_tracking.py --record 로 만든 파일")
+    parser.add_argument("--horizons", type=float, nargs="+", default=[0.016, 0.033, 0.05, 0.083, 0.1],
+                        help="평가할 예측 시간 (초)")
+    parser.add_argument("--velocity-cutoff", type=float, default=VELOCITY_CUTOFF)
+    parser.add_argument("--width", type=int, default=640, help="px 환산용 화면 가로 해상도")
+    parser.add_argument("--all-landmarks", action="store_true", help="검지 끝 대신 21개 전체로 평가")
+    args = parser.parse_args(argv)
+
+    landmark = None if args.all_landmarks else INDEX_TIP
+    report = {}
+    for horizon in args.horizons:
+        predicted, hold = prediction_errors(args.log, horizon, args.velocity_cutoff, landmark)
+        if predicted is None:
+            continue
+        report[f"{horizon:g}"] = {
+            "samples": int(len(predicted)),
+            "predicted": _summary(predicted, args.width),
+            "no_prediction": _summary(hold, args.width),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import struct
+
+import numpy as np
+
+from wire_format import HAND_IDS, HAND_NONE
+
+# 양손 21개 랜드마크 전체를 매 프레임 보내는 바이너리 스트림.
+# LandmarkStreamFrame.java / index.html 의 decodeLandmarkFrame 과 레이아웃을 맞출 것.
+#
+#  frame
+#  offset  type     field
+#   0      uint8    kind = 0x4C ('L')  (gesture 프레임은 0 번 바이트가 wire_format.VERSION = 1)
+#   1      uint8    version
+#   2      uint8    손 개수
+#   3      uint8    padding
+#   4      uint32   sequence
+#   8      float64  timestamp (초)
+#  16      손마다 블록
+#
+#  hand block
+#   0      uint8    hand id (wire_format.HAND_IDS)
+#   1      uint8    encoding (ENC_KEY / ENC_DELTA)
+#   2      uint16   keyframe id (ENC_KEY 면 새 id, ENC_DELTA 면 기준 keyframe id)
+#   4      ENC_KEY:   int16[21 * 3]  값 / STEP
+#          ENC_DELTA: int8[21 * 3]   keyframe 대비 차이 (DELTA_STEP 단위)
+#
+# delta 는 직전 프레임이 아니라 keyframe 기준이라 중간 프레임이 버려져도 (latest-only 전송)
+# keyframe 만 받았으면 항상 복원된다. 한 손이 keyframe 을 새로 만들면 그 프레임의 모든 손이 keyframe 이라
+# 마지막 keyframe 프레임 하나만 받아도 모든 손의 기준이 맞는다.
+
+KIND = 0x4C
+VERSION = 2  # 2: delta 단위를 STEP 에서 DELTA_STEP 으로
+
+STEP = 1.0 / 16384  # keyframe 양자화 단위 (640px 기준 약 0.04px), int16 범위는 -2.0 ~ 2.0
+# delta 양자화 단위. STEP 단위 int8 (약 ±5px) 은 움직이는 손이 거의 매 프레임 넘쳐서 keyframe 만 나갔다.
+# DELTA_STEP 이면 keyframe 에서 약 ±80px 까지 delta 로 보내고 오차는 DELTA_STEP / 2 (약 0.3px)
+DELTA_SCALE = 16
+DELTA_STEP = STEP * DELTA_SCALE
+ENC_KEY = 0
+ENC_DELTA = 1
+
+FRAME_HEADER = struct.Struct("<BBBxId")
+HAND_HEADER = struct.Struct("<BBH")
+VALUES = 21 * 3
+KEY_BYTES = VALUES * 2
+DELTA_BYTES = VALUES
+
+KEYFRAME_INTERVAL = 30  # 이 프레임 수마다 손별로 keyframe 을 다시 보낸다
+
+HAND_LABELS = {hand_id: label for label, hand_id in HAND_IDS.items()}
+
+
+def quantize(points):
+    q = np.rint(np.asarray(points, dtype=np.float32).reshape(VALUES) / STEP)
+    return np.clip(q, -32768, 32767).astype(np.int16)
+
+
+def dequantize(q):
+    return (q.astype(np.float32) * STEP).reshape(21, 3)
+
+
+def is_landmark_frame(data):
+    return len(data) >= FRAME_HEADER.size and data[0] == KIND
+
+
+class LandmarkStreamEncoder:
+    """손마다 keyframe 을 들고, keyframe 대비 변화가 int8 (DELTA_STEP 단위) 에 들어가면 delta 로 보낸다.
+
+    keyframe 은 keyframe_interval 프레임마다, 또는 delta 가 int8 범위를 넘으면 새로 만든다.
+    한 손이 keyframe 을 새로 만들면 그 프레임의 다른 손도 같이 keyframe 을 보낸다.
+    """
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self.stats = {"frames": 0, "keyframes": 0, "deltas": 0, "bytes": 0}
+        self._keys = {}  # hand id -> (keyframe id, quantized int16, 만든 sequence)
+        self._next_key_id = 0
+
+    def encode(self, timestamp, hands):
+        """hands: [(hand_label, (21, 3) 배열), ...] -> (bytes, keyframe 포함 여부)"""
+        self.sequence += 1
+        parts = [FRAME_HEADER.pack(KIND, VERSION, len(hands), self.sequence & 0xFFFFFFFF, timestamp)]
+        has_key = False
+
+        entries = []
+        for label, points in hands:
+            hand_id = HAND_IDS.get(label, HAND_NONE)
+            entries.append((hand_id, quantize(points), self._delta(hand_id, points)))
+        # 한 손이라도 keyframe 을 새로 만들면 모든 손을 keyframe 으로 보낸다. keyframe 이 든 프레임은 전송 큐에서
+        # 같은 키 ("landmarks:key") 를 쓰므로, 다음 keyframe 프레임에 덮어써져도 다른 손의 keyframe 이 사라지지 않는다
+        rekey = any(delta is None for _, _, delta in entries)
+
+        for hand_id, q, delta in entries:
+            if not rekey:
+                parts.append(HAND_HEADER.pack(hand_id, ENC_DELTA, self._keys[hand_id][0]))
+                parts.append(delta.astype(np.int8).tobytes())
+                self.stats["deltas"] += 1
+                continue
+
+            key_id = self._next_key_id
+            self._next_key_id = (self._next_key_id + 1) & 0xFFFF
+            self._keys[hand_id] = (key_id, q.astype(np.int32), self.sequence)
+            parts.append(HAND_HEADER.pack(hand_id, ENC_KEY, key_id))
+            parts.append(q.astype("<i2").tobytes())
+            self.stats["keyframes"] += 1
+            has_key = True
+
+        # 사라진 손은 다시 나타나면 keyframe 부터
+        seen = {HAND_IDS.get(label, HAND_NONE) for label, _ in hands}
+        for hand_id in list(self._keys):
+            if hand_id not in seen:
+                del self._keys[hand_id]
+
+        data = b"".join(parts)
+        self.stats["frames"] += 1
+        self.stats["bytes"] += len(data)
+        return data, has_key
+
+    def _delta(self, hand_id, points):
+        """keyframe 대비 int8 delta. keyframe 이 없거나 오래됐거나 int8 을 넘으면 None"""
+        key = self._keys.get(hand_id)
+        if key is None or self.sequence - key[2] >= self.keyframe_interval:
+            return None
+        # 양자화된 값이 아니라 원래 값에서 바로 반올림해야 오차가 DELTA_STEP / 2 안에 든다
+        exact = np.asarray(points, dtype=np.float64).reshape(VALUES) / STEP
+        delta = np.rint((exact - key[1]) / DELTA_SCALE)
+        if np.abs(delta).max() > 127:
+            return None
+        return delta
+
+
+class LandmarkStreamDecoder:
+    def __init__(self):
+        self._keys = {}  # hand id -> (keyframe id, int32 값)
+        self.missing = 0  # 기준 keyframe 을 못 받아서 복원하지 못한 손 수
+        self.encodings = []  # 마지막 프레임에서 복원한 손마다 ENC_KEY / ENC_DELTA
+
+    def decode(self, data):
+        """-> (sequence, timestamp, [(hand_label, (21, 3) float32), ...]). 복원 못 한 손은 빠진다."""
+        kind, version, count, sequence, timestamp = FRAME_HEADER.unpack_from(data)
+        if kind != KIND or version != VERSION:
+            raise ValueError(f"not a landmark stream frame (kind {kind:#x}, version {version})")
+
+        hands = []
+        self.encodings = []
+        offset = FRAME_HEADER.size
+        for _ in range(count):
+            hand_id, encoding, key_id = HAND_HEADER.unpack_from(data, offset)
+            offset += HAND_HEADER.size
+
+            if encoding == ENC_KEY:
+                q = np.frombuffer(data, dtype="<i2", count=VALUES, offset=offset).astype(np.int32)
+                offset += KEY_BYTES
+                self._keys[hand_id] = (key_id, q)
+            else:
+                delta = np.frombuffer(data, dtype=np.int8, count=VALUES, offset=offset)
+                offset += DELTA_BYTES
+                key = self._keys.get(hand_id)
+                if key is None or key[0] != key_id:
+                    self.missing += 1
+                    continue
+                q = key[1] + delta.astype(np.int32) * DELTA_SCALE
+
+            hands.append((HAND_LABELS.get(hand_id), dequantize(q)))
+            self.encodings.append(encoding)
+        return sequence, timestamp, hands
+
+
+def moving_hands(count, fps=30.0, seed=0):
+    """움직이는 손 랜드마크: [(timestamp, [(label, (21, 3) 배열), ...]), ...]
+
+    두 손이 화면 위에서 원을 그리며 (초당 화면 폭의 절반 정도) 움직이고, MediaPipe 정도의 흔들림이 있다.
+    왼손은 중간에 잠깐 화면 밖으로 나갔다 다시 들어온다.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (rng.random((21, 3)) * 0.15 - 0.075).astype(np.float32)
+    frames = []
+    for i in range(count):
+        t = i / fps
+        hands = []
+        for label, center, phase in (("Right", 0.65, 0.0), ("Left", 0.35, np.pi)):
+            if label == "Left" and count // 3 <= i < count // 3 + 10:
+                continue
+            angle = np.pi * t + phase
+            offset = np.array([center + 0.15 * np.cos(angle), 0.5 + 0.15 * np.sin(angle), 0.0], dtype=np.float32)
+            points = shape + offset + rng.normal(0, 0.002, (21, 3)).astype(np.float32)
+            hands.append((label, points))
+        frames.append((t, hands))
+    return frames
+
+
+def roundtrip(frames, keyframe_interval=KEYFRAME_INTERVAL):
+    """(timestamp, hands) 목록을 인코딩 -> 디코딩해서 keyframe / delta 별 오차, 비율과 크기를 잰다."""
+    encoder = LandmarkStreamEncoder(keyframe_interval)
+    decoder = LandmarkStreamDecoder()
+    max_error = {ENC_KEY: 0.0, ENC_DELTA: 0.0}
+    errors = []
+    for timestamp, hands in frames:
+        data, _ = encoder.encode(timestamp, hands)
+        _, decoded_ts, decoded = decoder.decode(data)
+        if decoded_ts != timestamp or len(decoded) != len(hands):
+            raise AssertionError(f"frame at {timestamp} did not round-trip")
+        for (label, points), (decoded_label, decoded_points), encoding in zip(hands, decoded, decoder.encodings):
+            if decoded_label != label:
+                raise AssertionError(f"hand label {label!r} decoded as {decoded_label!r}")
+            error = np.abs(decoded_points - points)
+            max_error[encoding] = max(max_error[encoding], float(error.max()))
+            errors.append(float(error.mean()))
+
+    frames_count = max(encoder.stats["frames"], 1)
+    hand_count = encoder.stats["keyframes"] + encoder.stats["deltas"]
+    return {
+        "frames": encoder.stats["frames"],
+        "keyframes": encoder.stats["keyframes"],
+        "deltas": encoder.stats["deltas"],
+        "keyframe_ratio": encoder.stats["keyframes"] / max(hand_count, 1),
+        "bytes_per_frame": encoder.stats["bytes"] / frames_count,
+        "float32_bytes_per_frame": (FRAME_HEADER.size * frames_count + hand_count * (HAND_HEADER.size + VALUES * 4))
+                                   / frames_count,
+        "max_key_error": max_error[ENC_KEY],
+        "max_delta_error": max_error[ENC_DELTA],
+        "mean_abs_error": float(np.mean(errors)) if errors else 0.0,
+        "key_error_bound": STEP / 2,
+        "delta_error_bound": DELTA_STEP / 2,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="랜드마크 스트림 인코딩 왕복 오차 / 크기 확인")
+    parser.add_argument("log", nargs="?", help="landmark_log 기록 파일 (기본: 움직이는 합성 랜드마크)")
+    parser.add_argument("--frames", type=int, default=2000, help="합성 랜드마크 프레임 수")
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    args = parser.parse_args(argv)
+
+    if args.log:
+        from landmark_log import read_log
+        frames = list(read_log(args.log))
+    else:
+        frames = moving_hands(args.frames)
+
+    report = roundtrip(frames, args.keyframe_interval)
+    print(json.dumps(report, indent=2))
+    if (report["max_key_error"] > report["key_error_bound"] * 1.001
+            or report["max_delta_error"] > report["delta_error_bound"] * 1.001):
+        raise SystemExit("✗ quantization error above bound")
+    print(f"✓ round-trip within quantization bound ({report['keyframe_ratio']:.1%} keyframes)")
+
+
+if __name__ == "__main__":
+    main()
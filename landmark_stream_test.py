@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# landmark_stream 인코딩 왕복 오차 / keyframe 비율 (mediapipe / cv2 없이 실행)
+#   python -m pytest -q landmark_stream_test.py
+import collections
+
+import numpy as np
+
+from landmark_stream import (DELTA_STEP, ENC_KEY, KEYFRAME_INTERVAL, STEP, LandmarkStreamDecoder,
+                             LandmarkStreamEncoder, moving_hands, roundtrip)
+
+# float32 로 복원하므로 경계값에서 반올림 오차만큼 여유를 둔다
+SLACK = 1.001
+
+
+def test_roundtrip_error_within_step():
+    report = roundtrip(moving_hands(600))
+    print(f"keyframes={report['keyframes']} deltas={report['deltas']} ratio={report['keyframe_ratio']:.1%}")
+
+    assert report["keyframes"] > 0 and report["deltas"] > 0
+    assert report["max_key_error"] <= STEP / 2 * SLACK
+    assert report["max_delta_error"] <= DELTA_STEP / 2 * SLACK
+    # 움직이는 손도 대부분 delta 로 나가야 한다 (keyframe_interval 주기 keyframe 포함)
+    assert report["keyframe_ratio"] < 0.2
+    assert report["bytes_per_frame"] < report["float32_bytes_per_frame"] / 2
+
+
+def test_still_hand_uses_deltas_between_keyframes():
+    points = np.full((21, 3), 0.5, dtype=np.float32)
+    report = roundtrip([(i / 30, [("Right", points)]) for i in range(KEYFRAME_INTERVAL * 3)])
+
+    assert report["keyframes"] == 3
+    assert report["deltas"] == KEYFRAME_INTERVAL * 3 - 3
+
+
+def test_hand_leaves_and_returns():
+    encoder = LandmarkStreamEncoder()
+    decoder = LandmarkStreamDecoder()
+    frames = moving_hands(120)
+    gone = [i for i, (_, hands) in enumerate(frames) if len(hands) == 1]
+    assert gone, "moving_hands should drop the left hand for a few frames"
+
+    for i, (timestamp, hands) in enumerate(frames):
+        data, has_key = encoder.encode(timestamp, hands)
+        _, _, decoded = decoder.decode(data)
+        assert [label for label, _ in decoded] == [label for label, _ in hands]
+        if i == gone[-1] + 1:
+            # 다시 나타난 손은 keyframe 부터 (그 프레임의 다른 손도 keyframe)
+            assert has_key and decoder.encodings == [ENC_KEY, ENC_KEY]
+        for (_, points), (_, decoded_points), encoding in zip(hands, decoded, decoder.encodings):
+            bound = STEP / 2 if encoding == ENC_KEY else DELTA_STEP / 2
+            assert np.abs(decoded_points - points).max() <= bound * SLACK
+    assert decoder.missing == 0
+
+
+def test_latest_only_queue_keeps_every_hand_decodable():
+    # Tracker.send_landmarks 처럼 keyframe / delta 를 키별로 최신 하나만 두고 가끔 비운다
+    encoder = LandmarkStreamEncoder()
+    decoder = LandmarkStreamDecoder()
+    pending = collections.OrderedDict()
+    for i, (timestamp, hands) in enumerate(moving_hands(300)):
+        data, has_key = encoder.encode(timestamp, hands)
+        key = "landmarks:key" if has_key else "landmarks:delta"
+        pending.pop(key, None)
+        pending[key] = (data, [label for label, _ in hands])
+        if i % 4 == 3:
+            for data, labels in pending.values():
+                _, _, decoded = decoder.decode(data)
+                assert [label for label, _ in decoded] == labels
+            pending.clear()
+    assert decoder.missing == 0
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_TIP = 12
+RING_TIP = 16
+PINKY_TIP = 20
+
+def landmarks_to_array(hand_landmarks, out=None):
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+    return out
+
+
+# 반올림은 직렬화할 때만
+def rounded_xy(points, idx, ndigits=5):
+    return round(float(points[idx, 0]), ndigits), round(float(points[idx, 1]), ndigits)
+
+
+class LandmarkBuffer:
+    """프레임마다 재사용하는 (max_hands, 21, 3) float32 랜드마크 버퍼"""
+
+    __slots__ = ("points", "labels", "count")
+
+    def __init__(self, max_hands=2):
+        self.points = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.labels = [None] * max_hands
+        self.count = 0
+
+    def fill(self, result):
+        self.count = 0
+        if not result.multi_hand_landmarks:
+            return 0
+
+        for hand_landmarks, handedness in zip(result.multi_hand_landmarks, result.multi_handedness):
+            if self.count >= len(self.labels):
+                break
+            landmarks_to_array(hand_landmarks, self.points[self.count])
+            self.labels[self.count] = handedness.classification[0].label
+            self.count += 1
+        return self.count
+
+    def fill_arrays(self, hands):
+        """MediaPipe 없이 (label, (21, 3) 배열) 목록으로 채운다."""
+        self.count = 0
+        for label, points in hands:
+            if self.count >= len(self.labels):
+                break
+            self.points[self.count] = points
+            self.labels[self.count] = label
+            self.count += 1
+        return self.count
+
+    @property
+    def hands(self):
+        return self.points[:self.count]
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import bisect
+import collections
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger("gesture_hud")
+
+# 초 단위 버킷 (16ms 프레임 예산 근처를 촘촘하게)
+DEFAULT_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.012, 0.016, 0.033, 0.066, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 + 최근 값 ring buffer (요약 출력의 백분위용)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "recent")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = collections.deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, q):
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q / 100.0 * len(values)))]
+
+
+class Metrics:
+    def __init__(self):
+        self.counters = collections.defaultdict(int)  # (name, labels) -> 값
+        self.histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._summary_thread = None
+        self._stop = threading.Event()
+
+    def inc(self, name, value=1, labels=()):
+        with self._lock:
+            self.counters[(name, labels)] += value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, fn):
+        """fn() -> {metric 이름: 값}. 다른 컴포넌트가 이미 세고 있는 값을 내보낼 때 사용"""
+        self._collectors.append(fn)
+
+    def _collected(self):
+        values = {}
+        for fn in self._collectors:
+            values.update(fn())
+        return values
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+            for name, h in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{name}_sum {h.sum}")
+                lines.append(f"{name}_count {h.count}")
+
+        for name, value in sorted(self._collected().items()):
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self):
+        parts = []
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                parts.append(f"{name} p50={h.percentile(50) * 1000:.1f}ms p95={h.percentile(95) * 1000:.1f}ms")
+            totals = collections.defaultdict(int)
+            for (name, _), value in self.counters.items():
+                totals[name] += value
+        parts.extend(f"{name}={value}" for name, value in sorted(totals.items()))
+        parts.extend(f"{name}={value}" for name, value in sorted(self._collected().items()))
+        return "[metrics] " + " | ".join(parts)
+
+    def start_summary(self, interval):
+        def run():
+            while not self._stop.wait(interval):
+                log.info(self.summary_line())
+
+        self._summary_thread = threading.Thread(target=run, name="metrics-summary", daemon=True)
+        self._summary_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class MetricsServer:
+    """GET /metrics 로 Prometheus text 형식 제공"""
+
+    def __init__(self, metrics, port):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f"[Metrics] http://localhost:{self._httpd.server_port}/metrics")
+        return self
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
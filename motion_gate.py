@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import cv2
+
+
+class NoHands:
+    """추론을 건너뛴 프레임의 결과 (손 없음). MediaPipe 결과와 같은 속성을 가진다."""
+
+    multi_hand_landmarks = None
+    multi_handedness = None
+
+
+NO_HANDS = NoHands()
+
+
+class MotionGate:
+    """손이 안 보이고 화면이 정지해 있으면 hands.process 를 건너뛴다.
+
+    마지막으로 추론한 프레임을 작게 줄인 흑백 이미지와 비교하므로, 천천히
+    들어오는 손도 변화가 쌓이면 잡힌다. 움직임이 보인 그 프레임부터 바로 추론한다.
+    """
+
+    def __init__(self, threshold=4.0, size=(64, 48), max_idle=2.0, rgb=False):
+        self.threshold = threshold  # 평균 밝기 차이 (0~255)
+        self.size = size
+        self.gray = cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY
+        self.max_idle = max_idle  # 정지 상태여도 이 간격(초)마다 한 번은 추론
+        self.skipped = 0
+        self._reference = None
+        self._last_infer = 0.0
+
+    def should_infer(self, frame, hands_visible, timestamp):
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), self.gray)
+
+        if (hands_visible or self._reference is None or timestamp - self._last_infer >= self.max_idle
+                or cv2.absdiff(small, self._reference).mean() >= self.threshold):
+            self._reference = small
+            self._last_infer = timestamp
+            return True
+
+        self.skipped += 1
+        return False
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import argparse
+import heapq
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import time
+
+from gesture_state import DEBOUNCE
+from wire_format import PHASE_END, PHASE_START
+from ws_sender import WebSocketSender
+
+log = logging.getLogger("gesture_hud")
+
+PUT_TIMEOUT = 0.1  # start / end 를 큐에 넣으려고 기다리는 한 번의 시간 (초). stop 전까지 계속 다시 시도
+
+
+def forward(events, event, stop):
+    """이벤트를 메인 프로세스 큐에 넣는다. 넣었으면 True.
+
+    update (와 프레임별 전송 이벤트) 는 다음 프레임 값이 곧 다시 오므로 큐가 가득 차면 버린다.
+    start / end 는 한 번만 가므로 버리면 HUD 가 제스처 중간에 멈추거나 시작 없는 update 를 받는다.
+    그래서 메인 프로세스가 큐를 비울 때까지 기다린다 (stop 이 걸리면 포기).
+    """
+    if event.phase not in (PHASE_START, PHASE_END):
+        try:
+            # 메인 프로세스가 밀려도 카메라 루프는 멈추지 않는다
+            events.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    while not stop.is_set():
+        try:
+            events.put(event, timeout=PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def camera_worker(source_id, spec, events, stop, width, height, smooth, rules=None, debounce=None, predict=0,
+                  profile=None):
+    """카메라 하나 = 프로세스 하나. 각자 MediaPipe Hands 와 GestureEngine 을 가진다."""
+    from capture import Capture, open_source
+    from gesture_engine import GestureEngine
+    from hand_tracking import create_hands, run_inference
+
+    # spec: "0", "1" -> 카메라, "dummy" / "synthetic", 디렉터리 -> 이미지, 그 외 -> 비디오 파일 (capture.open_source)
+    cap = Capture(open_source(spec, width, height))
+    engine = GestureEngine(rules=rules, smooth=smooth, debounce=debounce, predict=predict, profile=profile)
+    dropped = 0
+
+    with create_hands() as hands:
+        while not stop.is_set() and cap.isOpened():
+            timestamp = time.time()
+            frame = cap.read()
+            if frame is None:
+                break
+
+            for event in engine.process(run_inference(hands, frame), timestamp):
+                event.source = source_id
+                if not forward(events, event, stop):
+                    dropped += 1
+
+    cap.release()
+    if dropped:
+        log.warning("source %d: %d update events dropped (queue full)", source_id, dropped)
+
+
+class TimestampMerger:
+    """여러 소스의 이벤트를 timestamp 순서로 내보낸다.
+
+    이벤트는 window 초 동안만 기다렸다가 나가므로, 멈춘 소스가 있어도
+    다른 소스의 이벤트는 최대 window 만큼만 늦어진다.
+    """
+
+    def __init__(self, window=0.03):
+        self.window = window
+        self._heap = []
+        self._seq = itertools.count()
+        self._last_emitted = 0.0
+        self.late = 0  # 이미 더 늦은 이벤트를 내보낸 뒤 도착한 이벤트 수
+
+    def push(self, event):
+        heapq.heappush(self._heap, (event.timestamp, next(self._seq), event))
+
+    def pop_ready(self, now):
+        ready = []
+        while self._heap and self._heap[0][0] <= now - self.window:
+            timestamp, _, event = heapq.heappop(self._heap)
+            if timestamp < self._last_emitted:
+                self.late += 1
+            self._last_emitted = max(self._last_emitted, timestamp)
+            ready.append(event)
+        return ready
+
+    def flush(self):
+        ready = [event for _, _, event in sorted(self._heap)]
+        self._heap.clear()
+        return ready
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="카메라마다 프로세스 하나로 트래킹하고 이벤트를 합쳐서 전송")
+    parser.add_argument("--source", action="append", required=True,
+                        help="카메라 번호, 비디오 경로, 이미지 디렉터리, dummy 또는 synthetic (여러 번 지정)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8884)
+    parser.add_argument("--relay", action="append", default=[], metavar="[SCREEN=]URL[,URL]",
+                        help="여러 중계 서버로 나눠 보냄 (relay_pool.py, 여러 번 지정)")
+    parser.add_argument("--route", default="gesture", choices=["gesture", "screen"])
+    parser.add_argument("--window", type=float, default=0.03, help="timestamp 정렬 대기 시간 (초)")
+    parser.add_argument("--smooth", action="store_true")
+    parser.add_argument("--rules", metavar="PATH", help="제스처 규칙 파일 (기본: gestures.json)")
+    parser.add_argument("--profile", metavar="USER", help="사용자 보정 프로필 (calibration.py, 이름 또는 경로)")
+    parser.add_argument("--predict", type=float, default=0, metavar="SEC", help="예측 위치 px / py 포함")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, metavar="SEC", help="제스처 전환 debounce")
+    parser.add_argument("--per-frame", action="store_true", help="이벤트 대신 프레임마다 현재 제스처 전송")
+    parser.add_argument("--binary", action="store_true")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+
+    ctx = mp.get_context("spawn")
+    events = ctx.Queue(maxsize=256)
+    stop = ctx.Event()
+    workers = [
+        ctx.Process(target=camera_worker, name=f"camera-{i}",
+                    args=(i, spec, events, stop, args.width, args.height, args.smooth, args.rules,
+                          None if args.per_frame else args.debounce, args.predict, args.profile), daemon=True)
+        for i, spec in enumerate(args.source)
+    ]
+    for worker in workers:
+        worker.start()
+
+    if args.relay:
+        from relay_pool import RelayPool
+
+        sender = RelayPool.from_specs(args.relay, args.route).start()
+    else:
+        sender = WebSocketSender(f"ws://{args.host}:{args.port}").start()
+    merger = TimestampMerger(args.window)
+    counts = [0] * len(workers)
+
+    def emit(event):
+        counts[event.source] += 1
+        # 소스별로 따로 coalesce
+        sender.send(event.encode(args.binary), f"{event.source}:{event.coalesce_key}", event.timestamp)
+
+    try:
+        while any(worker.is_alive() for worker in workers) or not events.empty():
+            try:
+                merger.push(events.get(timeout=args.window))
+                while True:
+                    merger.push(events.get_nowait())
+            except queue.Empty:
+                pass
+            for event in merger.pop_ready(time.time()):
+                emit(event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for event in merger.flush():
+            emit(event)
+        for worker in workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        sender.stop()
+
+    for i, spec in enumerate(args.source):
+        print(f"source {i} ({spec}): {counts[i]} events")
+    print(f"late events: {merger.late}")
+    print(sender.summary())
+
+
+if __name__ == "__main__":
+    main()
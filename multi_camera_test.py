@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# multi_camera 워커 -> 메인 프로세스 큐가 가득 차도 start / end 가 사라지지 않는지 (카메라 / mediapipe 없이 실행)
+#   python -m pytest -q multi_camera_test.py
+import queue
+import threading
+import time
+
+from gesture_engine import GestureEvent
+from multi_camera import forward
+
+
+def _gestures(count, updates):
+    for i in range(count):
+        key = "pinch" if i % 2 else "pointer"
+        t = i * 1.0
+        yield GestureEvent(key, {"action": key}, t, hand="Right", phase="start")
+        for j in range(updates):
+            yield GestureEvent(key, {"action": key, "x": j / updates}, t + j * 0.01, hand="Right", phase="update")
+        yield GestureEvent(key, {"action": key}, t + 0.9, hand="Right", phase="end")
+
+
+def test_full_queue_drops_only_updates():
+    events = queue.Queue(maxsize=8)
+    stop = threading.Event()
+    received = []
+
+    def consume():
+        # 워커보다 느린 메인 프로세스
+        while not stop.is_set() or not events.empty():
+            try:
+                received.append(events.get(timeout=0.05))
+            except queue.Empty:
+                continue
+            time.sleep(0.0005)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    sent = list(_gestures(40, 30))
+    dropped = [event for event in sent if not forward(events, event, stop)]
+    stop.set()
+    consumer.join()
+
+    assert dropped, "queue never filled up"
+    assert all(event.phase == "update" for event in dropped)
+
+    active = None
+    for event in received:
+        if event.phase == "start":
+            assert active is None, f"{event.key} started while {active} was active"
+            active = event.key
+        elif event.phase == "end":
+            assert active == event.key
+            active = None
+        else:
+            assert event.key == active, "update without a start"
+    assert active is None
+    assert sum(event.phase == "start" for event in received) == 40
+    assert sum(event.phase == "end" for event in received) == 40
+
+
+def test_stop_releases_blocked_worker():
+    events = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    events.put_nowait(GestureEvent("pointer", {}, 0.0, phase="update"))
+    stop.set()
+    # 메인 프로세스가 끝났으면 start / end 도 기다리지 않고 포기한다
+    assert not forward(events, GestureEvent("pinch", {}, 1.0, hand="Right", phase="start"), stop)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import math
+
+import numpy as np
+
+
+# OneEuroFilter.java 를 numpy 로 옮긴 버전.
+# 스칼라 하나가 아니라 (손 x 랜드마크 x xyz) 배열 전체를 한 번에 필터링한다.
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, max_hands=2):
+        self.min_cutoff = min_cutoff  # 최소 차단 주파수 (떨림 제거용)
+        self.beta = beta  # 속도 계수 (지연 제거용)
+        self.d_cutoff = d_cutoff  # 파생 차단 주파수 (보통 1.0)
+        self.max_hands = max_hands
+
+        self._x_prev = None
+        self._dx_prev = None
+        self._t_prev = np.zeros(max_hands, dtype=np.float64)
+        self._initialized = np.zeros(max_hands, dtype=bool)
+
+    @staticmethod
+    def _alpha(te, cutoff):
+        r = 2 * math.pi * cutoff * te
+        return r / (r + 1.0)
+
+    def _ensure_state(self, point_shape):
+        if self._x_prev is None or self._x_prev.shape[1:] != point_shape:
+            self._x_prev = np.zeros((self.max_hands,) + point_shape, dtype=np.float32)
+            self._dx_prev = np.zeros_like(self._x_prev)
+            self._initialized[:] = False
+
+    def filter(self, x, t, hand_ids=None):
+        """x: (hands, landmarks, 3) 또는 (landmarks, 3), t: 초 단위 timestamp.
+
+        hand_ids 는 각 행이 사용할 상태 슬롯 번호 (기본값 0..hands-1).
+        이번 호출에 없는 슬롯은 손이 사라진 것으로 보고 리셋한다.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        single = x.ndim == 2
+        if single:
+            x = x[np.newaxis]
+
+        if hand_ids is None:
+            ids = np.arange(x.shape[0])
+        else:
+            ids = np.asarray(hand_ids, dtype=np.intp)
+
+        self._ensure_state(x.shape[1:])
+
+        lost = np.ones(self.max_hands, dtype=bool)
+        lost[ids] = False
+        self._initialized[lost] = False
+
+        fresh = ~self._initialized[ids]
+        te = t - self._t_prev[ids]
+        # 신호가 너무 빨리 들어오면(중복, te <= 0) 이전 값 리턴
+        valid = ~fresh & (te > 0.0)
+
+        x_prev = self._x_prev[ids]
+        dx_prev = self._dx_prev[ids]
+        expand = (slice(None),) + (np.newaxis,) * (x.ndim - 1)
+        te_safe = np.where(valid, te, 1.0)[expand]
+
+        # 1. 변화율(속도) 계산 및 필터링
+        dx = (x - x_prev) / te_safe
+        a_d = self._alpha(te_safe, self.d_cutoff)
+        dx_hat = a_d * dx + (1.0 - a_d) * dx_prev
+
+        # 2. 속도에 따른 컷오프 주파수 조절 (적응형)
+        cutoff = self.min_cutoff + self.beta * np.abs(dx_hat)
+
+        # 3. 최종 값 필터링
+        a = self._alpha(te_safe, cutoff)
+        x_hat = a * x + (1.0 - a) * x_prev
+
+        valid_b = valid[expand]
+        fresh_b = fresh[expand]
+        out = np.where(valid_b, x_hat, np.where(fresh_b, x, x_prev)).astype(np.float32)
+        new_dx = np.where(valid_b, dx_hat, np.where(fresh_b, 0.0, dx_prev))
+
+        self._x_prev[ids] = out
+        self._dx_prev[ids] = new_dx
+        self._t_prev[ids] = np.where(valid | fresh, t, self._t_prev[ids])
+        self._initialized[ids] = True
+
+        return out[0] if single else out
+
+    # 리셋용
+    def reset(self, hand_id=None):
+        if hand_id is None:
+            self._initialized[:] = False
+        else:
+            self._initialized[hand_id] = False
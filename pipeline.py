@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import collections
+import threading
+import time
+
+
+# 가득 차면 가장 오래된 항목을 버리는 bounded queue (항상 최신 프레임 유지)
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    def __init__(self, name, window=120):
+        self.name = name
+        self.count = 0
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return 0.0, 0.0
+        return sum(samples) / len(samples) * 1000.0, max(samples) * 1000.0
+
+
+class Pipeline:
+    """capture -> infer -> send 3단계를 각각의 스레드에서 실행한다.
+
+    capture() 는 프레임(끝이면 None), infer(frame, t_capture) 는 결과,
+    send(result) 는 전송을 담당한다. infer 결과는 화면 표시용으로
+    `results` 큐에도 들어간다.
+    """
+
+    def __init__(self, capture, infer, send, queue_size=1, report_interval=2.0):
+        self.capture = capture
+        self.infer = infer
+        self.send = send
+        self.report_interval = report_interval
+
+        self.frame_queue = DropOldestQueue(queue_size)
+        self.send_queue = DropOldestQueue(queue_size)
+        self.results = DropOldestQueue(1)
+
+        self.stats = {
+            "capture": StageStats("capture"),
+            "infer": StageStats("infer"),
+            "send": StageStats("send"),
+            "latency": StageStats("latency"),
+        }
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_report = time.time()
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def start(self):
+        for name, target in (("capture", self._capture_loop),
+                             ("infer", self._infer_loop),
+                             ("send", self._send_loop)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+
+    def _capture_loop(self):
+        while self.running:
+            start = time.perf_counter()
+            t_capture = time.time()
+            frame = self.capture()
+            if frame is None:
+                self._stop.set()
+                break
+            self.stats["capture"].add(time.perf_counter() - start)
+            self.frame_queue.put((t_capture, frame))
+
+    def _infer_loop(self):
+        while self.running:
+            item = self.frame_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            t_capture, frame = item
+            start = time.perf_counter()
+            result = self.infer(frame, t_capture)
+            self.stats["infer"].add(time.perf_counter() - start)
+            self.send_queue.put((t_capture, result))
+            self.results.put(result)
+
+    def _send_loop(self):
+        while self.running:
+            item = self.send_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            t_capture, result = item
+            start = time.perf_counter()
+            self.send(result)
+            self.stats["send"].add(time.perf_counter() - start)
+            self.stats["latency"].add(time.time() - t_capture)
+            self.maybe_report()
+
+    def report(self):
+        parts = []
+        for name in ("capture", "infer", "send", "latency"):
+            avg_ms, max_ms = self.stats[name].summary()
+            parts.append(f"{name} {avg_ms:.1f}/{max_ms:.1f}ms")
+        parts.append(f"q frame={self.frame_queue.qsize()} (drop {self.frame_queue.dropped})")
+        parts.append(f"q send={self.send_queue.qsize()} (drop {self.send_queue.dropped})")
+        return "[pipeline] " + " | ".join(parts)
+
+    def maybe_report(self):
+        now = time.time()
+        if self.report_interval and now - self._last_report >= self.report_interval:
+            self._last_report = now
+            print(self.report())
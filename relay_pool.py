@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import json
+import threading
+import time
+import zlib
+
+from wire_format import GESTURE_IDS
+from ws_sender import WebSocketSender
+
+ROUTES = ("gesture", "screen")
+PING_INTERVAL = 1.0  # 초. 중계 서버 health check 간격
+PING_TIMEOUT = 0.5
+MAX_BACKLOG = 32  # 이보다 많이 밀린 연결은 다른 연결이 있으면 건너뛴다
+CHECK_INTERVAL = 0.05  # 끊긴 연결에 남은 메시지를 옮기는 주기 (초)
+STREAMS = set(GESTURE_IDS) | {"landmarks"}
+
+
+def parse_relays(specs):
+    """["left=ws://a:8884,ws://b:8884", "ws://c:8885"] -> [(화면 이름, [url, ...]), ...]
+
+    화면마다 첫 url 이 기본, 나머지는 그 화면의 예비 중계 서버. 이름이 없으면 순서대로 0, 1, ...
+    """
+    screens = []
+    for i, spec in enumerate(specs):
+        name, sep, urls = spec.partition("=")
+        if not sep or "://" in name:
+            name, urls = str(i), spec
+        screens.append((name, [url for url in urls.split(",") if url]))
+    return screens
+
+
+def stream_of(key):
+    """coalesce 키 -> 제스처 이름 ("Right:pinch:start", "0:pointer", "landmarks:key" 등). 모르는 키는 그대로"""
+    for part in key.split(":"):
+        if part in STREAMS:
+            return part
+    return key
+
+
+class Relay:
+    __slots__ = ("screen", "url", "sender", "routed", "up")
+
+    def __init__(self, screen, url, sender):
+        self.screen = screen
+        self.url = url
+        self.sender = sender
+        self.routed = 0  # 이 연결로 보낸 메시지 수
+        self.up = False  # monitor 가 마지막으로 본 상태 (로그용)
+
+    def available(self):
+        return self.sender.connected and self.sender.backlog < MAX_BACKLOG
+
+
+class RelayPool:
+    """여러 중계 서버 (MainServer / HeadlessServer) 로 보내는 WebSocketSender 묶음. send() 는 블로킹하지 않는다.
+
+    route="gesture": 모든 중계 서버를 한 묶음으로 보고 제스처 종류마다 한 곳으로 보낸다 (rendezvous hash).
+        같은 제스처는 살아 있는 한 같은 서버로 가고, 그 서버가 죽거나 밀리면 다음 순위 서버로 간다.
+    route="screen": 화면마다 메시지를 하나씩 보낸다 (fan-out). 화면 안에서는 기본 -> 예비 순서.
+
+    연결 상태는 각 WebSocketSender 의 ping health check 와 전송 오류로 판단하고, 끊긴 연결에 남아 있던
+    메시지는 monitor 스레드가 살아 있는 연결로 옮긴다.
+    """
+
+    def __init__(self, screens, route="gesture", metrics=None, ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT,
+                 **sender_options):
+        if route not in ROUTES:
+            raise ValueError(f"unknown route {route!r} (expected one of {', '.join(ROUTES)})")
+        self.route = route
+        self.screens = []  # [(화면 이름, [Relay, ...]), ...]
+        self.relays = []
+        for name, urls in screens:
+            relays = [Relay(name, url, WebSocketSender(url, metrics=metrics, ping_interval=ping_interval,
+                                                       ping_timeout=ping_timeout, **sender_options))
+                      for url in urls]
+            self.screens.append((name, relays))
+            self.relays.extend(relays)
+        if not self.relays:
+            raise ValueError("relay pool needs at least one url")
+
+        self.failovers = 0  # 끊긴 연결에서 다른 연결로 옮긴 메시지 수
+        self.rerouted = 0  # 1 순위가 아닌 연결로 보낸 메시지 수
+        self._ranking = {}  # 제스처 -> rendezvous 순서의 Relay 목록
+        self._stop = threading.Event()
+        self._monitor = None
+
+    @classmethod
+    def from_specs(cls, specs, route="gesture", **options):
+        return cls(parse_relays(specs), route, **options)
+
+    @property
+    def connected(self):
+        return any(relay.sender.connected for relay in self.relays)
+
+    @property
+    def stats(self):
+        totals = dict.fromkeys(self.relays[0].sender.stats, 0)
+        for relay in self.relays:
+            for name, value in relay.sender.stats.items():
+                totals[name] += value
+        totals["failovers"] = self.failovers
+        totals["rerouted"] = self.rerouted
+        return totals
+
+    def start(self):
+        for relay in self.relays:
+            relay.sender.start()
+        self._monitor = threading.Thread(target=self._watch, name="relay-monitor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=2.0)
+        for relay in self.relays:
+            relay.sender.stop()
+
+    def send(self, data, key=None, captured_at=None):
+        captured_at = captured_at or time.time()
+        if self.route == "screen":
+            for _, relays in self.screens:
+                self._pick(relays).sender.send(data, key, captured_at)
+            return
+        self._pick(self._ranked(key)).sender.send(data, key, captured_at)
+
+    def _ranked(self, key):
+        stream = stream_of(key or "")
+        ranking = self._ranking.get(stream)
+        if ranking is None:
+            # 중계 서버 목록이 바뀌지 않으므로 제스처마다 한 번만 계산한다
+            ranking = self._ranking[stream] = sorted(
+                self.relays, key=lambda relay: zlib.crc32(f"{stream}|{relay.url}".encode()), reverse=True)
+        return ranking
+
+    def _pick(self, relays, exclude=None):
+        for i, relay in enumerate(relays):
+            if relay is not exclude and relay.available():
+                if i:
+                    self.rerouted += 1
+                relay.routed += 1
+                return relay
+        # 모두 끊겼거나 밀려 있으면 살아 있는 것 중 덜 밀린 곳, 그것도 없으면 1 순위 (다시 연결되면 보낸다)
+        live = [relay for relay in relays if relay.sender.connected and relay is not exclude]
+        relay = min(live, key=lambda r: r.sender.backlog) if live else relays[0]
+        relay.routed += 1
+        return relay
+
+    def _watch(self):
+        while not self._stop.wait(CHECK_INTERVAL):
+            for relay in self.relays:
+                up = relay.sender.connected
+                if up != relay.up:
+                    relay.up = up
+                    print(f"{'✓' if up else '✗'} relay {relay.screen} ({relay.url}) {'up' if up else 'down'}")
+                if up or not relay.sender.backlog:
+                    continue
+                # 끊긴 연결에 남아 있던 메시지를 같은 경로의 다른 연결로 옮긴다
+                for key, queued_at, data in relay.sender.drain():
+                    candidates = self._ranked(key) if self.route == "gesture" else self._screen(relay.screen)
+                    target = self._pick(candidates, exclude=relay)
+                    target.sender.send(data, key, queued_at)
+                    if target is not relay:
+                        self.failovers += 1
+
+    def _screen(self, name):
+        for screen, relays in self.screens:
+            if screen == name:
+                return relays
+        return self.relays
+
+    def summary(self):
+        s = self.stats
+        lines = [f"[relays] route={self.route} sent={s['sent']} dropped={s['dropped']} coalesced={s['coalesced']} "
+                 f"failovers={s['failovers']} rerouted={s['rerouted']} ping_failures={s['ping_failures']}"]
+        for relay in self.relays:
+            rtt = f"{relay.sender.rtt * 1000:.1f}ms" if relay.sender.rtt is not None else "-"
+            lines.append(f"  {relay.screen} {relay.url}: routed={relay.routed} sent={relay.sender.stats['sent']} "
+                         f"rtt={rtt} {'up' if relay.sender.connected else 'down'}")
+        return "\n".join(lines)
+
+
+class StandInRelay:
+    """JVM 없이 쓰는 테스트 / 벤치마크용 중계 서버. 받은 메시지를 (받은 시각, 데이터) 로 기록한다.
+
+    kill() 은 프로세스가 죽은 것처럼 연결을 끊고, hang() 은 연결은 둔 채 읽기를 멈춘다 (ping 에도 응답 없음).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.received = []  # [(time.perf_counter(), 메시지), ...]
+        self.connections = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"stand-in-{self.port}", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2.0)
+
+    def kill(self):
+        self._loop.call_soon_threadsafe(self._abort)
+
+    def hang(self):
+        self._loop.call_soon_threadsafe(self._pause)
+
+    def _abort(self):
+        self._server.close()
+        for ws in list(self.connections):
+            ws.transport.abort()
+
+    def _pause(self):
+        for ws in list(self.connections):
+            ws.transport.pause_reading()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(self._serve())
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._close())
+            self._loop.close()
+
+    async def _close(self):
+        # 닫기 handshake 없이 바로 끊는다 (hang() 으로 멈춘 연결은 응답하지 않는다)
+        self._abort()
+        try:
+            await asyncio.wait_for(self._server.wait_closed(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _serve(self):
+        import websockets
+
+        return await websockets.serve(self._handler, self.host, self.port)
+
+    async def _handler(self, ws, path=None):
+        self.connections.add(ws)
+        try:
+            async for message in ws:
+                self.received.append((time.perf_counter(), message))
+        except Exception:
+            pass
+        finally:
+            self.connections.discard(ws)
+
+
+def _wait(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def bench_fanout(count, route, messages):
+    """stand-in 중계 서버 count 개로 send() 비용과 전달 처리량을 잰다."""
+    relays = [StandInRelay().start() for _ in range(count)]
+    pool = RelayPool([(str(i), [relay.url]) for i, relay in enumerate(relays)], route).start()
+    try:
+        _wait(lambda: all(relay.sender.connected for relay in pool.relays), 5.0)
+        streams = sorted(STREAMS)
+        expected = messages * (count if route == "screen" else 1)
+
+        start = time.perf_counter()
+        for i in range(messages):
+            # 키가 모두 달라서 coalesce 없이 전부 전달된다
+            stream = streams[i % len(streams)]
+            pool.send(f"{stream}|{i}", f"{stream}:{i}")
+        sent = time.perf_counter() - start
+        delivered = _wait(lambda: sum(len(relay.received) for relay in relays) >= expected, 30.0)
+        elapsed = time.perf_counter() - start
+        return {
+            "route": route,
+            "relays": count,
+            "messages": messages,
+            "delivered": sum(len(relay.received) for relay in relays),
+            "complete": delivered,
+            "send_call_us": sent / messages * 1e6,
+            "delivered_per_s": sum(len(relay.received) for relay in relays) / elapsed,
+            "per_relay": [len(relay.received) for relay in relays],
+        }
+    finally:
+        pool.stop()
+        for relay in relays:
+            relay.stop()
+
+
+def bench_failover(count, mode, rate=500.0, duration=3.0, stream="pointer"):
+    """stream 을 맡은 중계 서버를 중간에 죽이고 (kill) 또는 멈추고 (hang), 다른 서버가 그 stream 을
+    처음 받을 때까지 걸린 시간을 잰다."""
+    relays = [StandInRelay().start() for _ in range(count)]
+    pool = RelayPool([(str(i), [relay.url]) for i, relay in enumerate(relays)], "gesture").start()
+    try:
+        _wait(lambda: all(relay.sender.connected for relay in pool.relays), 5.0)
+        primary = pool._ranked(stream)[0]
+        victim = relays[pool.relays.index(primary)]
+
+        failed_at = None
+        start = time.perf_counter()
+        i = 0
+        while time.perf_counter() - start < duration:
+            now = time.perf_counter()
+            if failed_at is None and now - start >= duration / 3:
+                failed_at = now
+                getattr(victim, mode)()
+            pool.send(f"{stream}|{i}|{now}", stream, time.time())
+            i += 1
+            time.sleep(1.0 / rate)
+        time.sleep(0.2)
+
+        recovered = [t for relay in relays if relay is not victim for t, _ in relay.received if t > failed_at]
+        return {
+            "mode": mode,
+            "relays": count,
+            "rate": rate,
+            "failover_ms": (min(recovered) - failed_at) * 1000 if recovered else None,
+            "moved": pool.failovers,
+            "ping_failures": pool.stats["ping_failures"],
+        }
+    finally:
+        pool.stop()
+        for relay in relays:
+            relay.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="stand-in 중계 서버로 relay pool fan-out / failover 측정")
+    parser.add_argument("--relays", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=20000, help="fan-out 측정 메시지 수")
+    parser.add_argument("--rate", type=float, default=500.0, help="failover 측정 전송 속도 (메시지/초)")
+    parser.add_argument("--duration", type=float, default=3.0, help="failover 측정 시간 (초)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "fanout": [bench_fanout(args.relays, route, args.messages) for route in ROUTES],
+        "failover": [bench_failover(args.relays, mode, args.rate, args.duration) for mode in ("kill", "hang")],
+    }
+    print(json.dumps(report, indent=2))
+    for result in report["fanout"]:
+        print(f"{'✓' if result['complete'] else '✗'} {result['route']}: {result['delivered_per_s']:.0f} msg/s delivered, "
+              f"send() {result['send_call_us']:.1f}us")
+    for result in report["failover"]:
+        latency = result["failover_ms"]
+        print(f"{'✓' if latency is not None else '✗'} {result['mode']}: failover "
+              f"{'-' if latency is None else f'{latency:.0f}ms'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import cv2
+
+
+class RoiScheduler:
+    """직전 프레임의 손 주변만 잘라서 hands.process 에 넣는다.
+
+    - 추적이 안정적이면 손 bounding box (+ padding) 만 처리
+    - full_every 프레임마다, 또는 신뢰도가 떨어지거나 crop 에서 손을 놓치면 전체 프레임 검출
+    - 손이 크게 보이면 crop 을 축소해서 처리 (target_hand_px 기준)
+    - 결과 랜드마크는 전체 프레임 기준 정규화 좌표로 되돌려 놓으므로 전송되는 x/y 는 그대로다
+    - crop 은 전체 프레임과 다른 Hands 인스턴스로 추론한다. MediaPipe video mode 는 직전 이미지의 랜드마크로
+      다음 이미지를 추적하므로, 좌표계가 다른 전체 프레임과 crop 을 한 인스턴스에 섞으면 추적이 어긋난다.
+      ROI 가 바뀌어 crop 좌표계가 달라지면 crop 인스턴스의 추적 상태를 버린다
+    """
+
+    def __init__(self, full_every=30, padding=0.35, min_size=0.25, min_score=0.8,
+                 target_hand_px=200, min_scale=0.5):
+        self.full_every = full_every
+        self.padding = padding  # 손 크기 대비 여백 비율
+        self.min_size = min_size  # ROI 최소 크기 (프레임 대비)
+        self.min_score = min_score  # 이보다 낮은 handedness 점수면 다음 프레임은 전체 검출
+        self.target_hand_px = target_hand_px
+        self.min_scale = min_scale
+
+        self.stats = {"full": 0, "roi": 0, "retry": 0}
+        self.crop_resets = 0  # ROI 가 바뀌어 crop 인스턴스 추적 상태를 버린 횟수
+        self._roi = None  # (x0, y0, x1, y1) 정규화 좌표
+        self._crop_roi = None  # crop 인스턴스가 마지막으로 추적한 ROI
+        self._since_full = 0
+
+    def reset(self):
+        self._roi = None
+
+    def process(self, frame, infer, infer_crop, reset_crop=None):
+        """infer(image) / infer_crop(image) -> MediaPipe 결과. frame 은 전체 프레임 (infer 가 받는 색 순서 그대로).
+
+        infer 는 전체 프레임 전용, infer_crop 은 crop 전용 Hands 인스턴스. reset_crop() 은 crop 인스턴스의
+        추적 상태를 버린다 (ROI 가 바뀔 때 호출).
+        """
+        roi = self._roi
+        if roi is None or self._since_full >= self.full_every:
+            return self._full(frame, infer)
+
+        if roi != self._crop_roi:
+            if self._crop_roi is not None and reset_crop is not None:
+                reset_crop()
+                self.crop_resets += 1
+            self._crop_roi = roi
+
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = roi
+        px0, py0 = int(x0 * width), int(y0 * height)
+        px1, py1 = int(x1 * width), int(y1 * height)
+        image = frame[py0:py1, px0:px1]
+
+        scale = self._scale(width, height)
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        result = infer_crop(image)
+        if not self._confident(result):
+            # crop 에서 손을 놓치면 같은 프레임을 전체 검출로 다시 처리
+            self.stats["retry"] += 1
+            return self._full(frame, infer)
+
+        # 실제로 잘린 픽셀 경계 기준으로 되돌린다
+        self._map_back(result, px0 / width, py0 / height, (px1 - px0) / width, (py1 - py0) / height)
+        self.stats["roi"] += 1
+        self._since_full += 1
+        self._update_roi(result)
+        return result
+
+    def summary(self):
+        s = self.stats
+        return f"[roi] full={s['full']} roi={s['roi']} retry={s['retry']} crop_resets={self.crop_resets}"
+
+    def _full(self, frame, infer):
+        result = infer(frame)
+        self.stats["full"] += 1
+        self._since_full = 0
+        if self._confident(result):
+            self._update_roi(result)
+        else:
+            self._roi = None
+        return result
+
+    def _confident(self, result):
+        if not result.multi_hand_landmarks:
+            return False
+        return all(h.classification[0].score >= self.min_score for h in result.multi_handedness)
+
+    def _scale(self, width, height):
+        hand_px = max((self._bbox[2] - self._bbox[0]) * width, (self._bbox[3] - self._bbox[1]) * height)
+        if hand_px <= self.target_hand_px:
+            return 1.0
+        return max(self.min_scale, self.target_hand_px / hand_px)
+
+    @staticmethod
+    def _map_back(result, x0, y0, w, h):
+        for hand_landmarks in result.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = x0 + lm.x * w
+                lm.y = y0 + lm.y * h
+                lm.z = lm.z * w  # z 는 x 와 같은 스케일
+
+    def _update_roi(self, result):
+        xs = [lm.x for hand in result.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in result.multi_hand_landmarks for lm in hand.landmark]
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+        self._bbox = bbox
+
+        # 손이 현재 ROI 안쪽에 머물러 있으면 ROI 를 그대로 둔다 (MediaPipe 추적이 흔들리지 않도록)
+        if self._roi is not None and self._inside(bbox, self._roi):
+            return
+
+        size = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        half = max(size * (0.5 + self.padding), self.min_size / 2)
+        cx = (bbox[0] + bbox[2]) / 2
+        cy = (bbox[1] + bbox[3]) / 2
+        self._roi = (max(0.0, cx - half), max(0.0, cy - half), min(1.0, cx + half), min(1.0, cy + half))
+
+    def _inside(self, bbox, roi):
+        margin_x = (roi[2] - roi[0]) * self.padding / 4
+        margin_y = (roi[3] - roi[1]) * self.padding / 4
+        inside = (bbox[0] >= roi[0] + margin_x and bbox[1] >= roi[1] + margin_y and
+                  bbox[2] <= roi[2] - margin_x and bbox[3] <= roi[3] - margin_y)
+        # 손이 ROI 에 비해 너무 작아졌으면 다시 맞춘다 (min_size 로 키운 ROI 는 그대로 둔다)
+        size = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        fitted = max(size * (1 + 2 * self.padding), self.min_size)
+        return inside and fitted >= 0.5 * max(roi[2] - roi[0], roi[3] - roi[1])
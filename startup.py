@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+WARMUP_RUNS = 2  # 빈 프레임 추론 횟수. 첫 호출에서 그래프 / 텐서 할당, 두 번째까지는 캐시가 덜 찬다
+
+
+def process_age():
+    """프로세스가 시작된 뒤 지난 시간 (초). 인터프리터 기동 + import 시간을 포함한다. /proc 이 없으면 None"""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # 실행 파일 이름에 공백이 있을 수 있으므로 ')' 뒤부터 센다. starttime 은 22 번째 필드
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    """시작 단계별 소요 시간과 첫 프레임 / 첫 제스처까지 걸린 시간.
+
+    phases 는 단계마다 걸린 시간 (동시에 돈 단계는 서로 겹친다), marks 는 프로세스 시작
+    (리눅스가 아니면 StartupTimer 를 만든 시각) 부터 그 시점까지 걸린 시간이다.
+    """
+
+    def __init__(self):
+        age = process_age()
+        self.origin = time.perf_counter() - (age or 0.0)
+        self.phases = {}
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """처음 호출될 때만 기록하고 True"""
+        with self._lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = time.perf_counter() - self.origin
+            return True
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def _timed(self, name, fn):
+        with self.phase(name):
+            return fn()
+
+    def run(self, tasks, parallel=True):
+        """{이름: 함수} -> {이름: 결과}. parallel 이면 함수마다 스레드 하나로 동시에 실행한다.
+
+        카메라 열기 / 모델 로드 / 서버 연결은 대부분 C 코드나 I/O 에서 기다리므로 GIL 과 상관없이 겹친다.
+        하나라도 실패하면 나머지가 끝난 뒤 그 예외를 다시 던진다.
+        """
+        if not parallel:
+            return {name: self._timed(name, fn) for name, fn in tasks.items()}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="startup") as pool:
+            futures = {name: pool.submit(self._timed, name, fn) for name, fn in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def collect(self):
+        """Metrics.add_collector 용. 단계는 startup_phase_seconds, 시점은 startup_seconds (프로세스 시작 기준)"""
+        values = {f'startup_phase_seconds{{phase="{name}"}}': round(value, 4) for name, value in self.phases.items()}
+        values.update({f'startup_seconds{{mark="{name}"}}': round(value, 4) for name, value in self.marks.items()})
+        return values
+
+    def summary(self):
+        phases = " ".join(f"{name}={value * 1000:.0f}ms" for name, value in self.phases.items())
+        marks = " ".join(f"{name}={value * 1000:.0f}ms" for name, value in self.marks.items())
+        return f"[startup] {phases} | since launch: {marks or '-'}"
+
+
+def probe(source="synthetic", width=640, height=480, warmup=WARMUP_RUNS, parallel=True):
+    """hand_tracking 과 같은 순서로 시작해서 첫 추론까지의 단계별 시간 (benchmark.py 가 새 프로세스로 실행)"""
+    timer = StartupTimer()
+    timer.mark("interpreter")
+
+    def camera():
+        with timer.phase("import_cv2"):
+            import cv2  # noqa: F401
+        from capture import Capture, open_source
+        return Capture(open_source(source, width, height))
+
+    def model():
+        with timer.phase("import_mediapipe"):
+            import mediapipe  # noqa: F401
+        from hand_tracking import create_hands, warm_up
+        with timer.phase("model_create"):
+            hands = create_hands()
+        with timer.phase("warmup"):
+            warm_up(hands, (height, width, 3), warmup)
+        return hands
+
+    ready = timer.run({"camera_open": camera, "model_load": model}, parallel)
+    timer.mark("ready")
+    cap, hands = ready["camera_open"], ready["model_load"]
+
+    from hand_tracking import run_inference
+    with hands:
+        with timer.phase("first_read"):
+            frame = cap.read()
+        with timer.phase("first_inference"):
+            run_inference(hands, frame)
+        timer.mark("first_inference")
+        with timer.phase("second_inference"):
+            run_inference(hands, frame)
+    cap.release()
+    return {"parallel": parallel, "warmup": warmup, "phases": timer.phases, "marks": timer.marks}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트래커 시작 단계별 시간 측정 (새 프로세스에서 한 번)")
+    parser.add_argument("--source", default="synthetic", help="capture.open_source 형식 (기본: synthetic)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--warmup", type=int, default=WARMUP_RUNS, metavar="N", help="빈 프레임 warm-up 횟수")
+    parser.add_argument("--sequential", action="store_true", help="카메라 / 모델을 차례로 연다 (비교용)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄로 출력")
+    args = parser.parse_args(argv)
+
+    report = probe(args.source, args.width, args.height, args.warmup, not args.sequential)
+    if args.json:
+        print(json.dumps(report))
+        return
+    for group in ("phases", "marks"):
+        for name, value in report[group].items():
+            print(f"{group[:-1]:5s} {name:18s} {value * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import struct
+
+import numpy as np
+
+# JSON 메시지 {gesturekey: {"action": ..., "x", "y", "current_dist"}} 과 같은 내용을
+# 고정 길이 little-endian 바이너리 프레임으로 보낸다.
+# GestureFrame.java / index.html 의 decodeGestureFrame 과 레이아웃을 맞출 것.
+# 레이아웃 기준 바이트열은 wire_format_test.py 의 GOLDEN.
+#
+#  offset  type     field
+#   0      uint8    version
+#   1      uint8    gesture key (GESTURES index)
+#   2      uint8    action      (GESTURES index)
+#   3      uint8    hand id     (0 = Right, 1 = Left, 255 = 없음)
+#   4      uint8    flags
+#   5      uint8    source id (multi_camera.py, FLAG_SOURCE 일 때만 의미 있음)
+#   6      uint8    phase (PHASES index, FLAG_PHASE 일 때만 의미 있음)
+#   7      1 byte   padding
+#   8      float64  timestamp (초)
+#  16      float32  x
+#  20      float32  y
+#  24      float32  current_dist
+#  28      float32  px, py 예측 위치 (FLAG_PREDICTED 일 때만, 8 bytes)
+#  28/36   float32[21 * 3]  landmarks (FLAG_LANDMARKS 일 때만, 예측 블록 뒤)
+
+VERSION = 1
+
+# 순서 변경 금지 (뒤에 추가만)
+GESTURES = ("none", "pointer", "pinch", "pinch_zoom", "left_pinch", "drag", "expansion_zoom", "rotate")
+GESTURE_IDS = {name: i for i, name in enumerate(GESTURES)}
+
+HAND_RIGHT = 0
+HAND_LEFT = 1
+HAND_NONE = 255
+HAND_IDS = {"Right": HAND_RIGHT, "Left": HAND_LEFT}
+
+FLAG_POSITION = 0x01
+FLAG_DIST = 0x02
+FLAG_LANDMARKS = 0x04
+FLAG_SOURCE = 0x08
+FLAG_PHASE = 0x10
+FLAG_PREDICTED = 0x20
+
+# GestureStateMachine 이벤트 단계 (0 = 단계 없는 프레임별 전송)
+PHASES = ("", "start", "update", "end")
+PHASE_START = "start"
+PHASE_UPDATE = "update"
+PHASE_END = "end"
+PHASE_IDS = {name: i for i, name in enumerate(PHASES)}
+
+HEADER = struct.Struct("<BBBBBBBxdfff")
+PREDICTED = struct.Struct("<ff")
+LANDMARK_SHAPE = (21, 3)
+LANDMARK_BYTES = 21 * 3 * 4
+
+
+def encode_gesture(gesturekey, payload, timestamp, hand_id=HAND_NONE, landmarks=None, source=None, phase=None):
+    flags = 0
+    if "x" in payload:
+        flags |= FLAG_POSITION
+    if "current_dist" in payload:
+        flags |= FLAG_DIST
+    if landmarks is not None:
+        flags |= FLAG_LANDMARKS
+    if source is not None:
+        flags |= FLAG_SOURCE
+    if phase:
+        flags |= FLAG_PHASE
+    if "px" in payload:
+        flags |= FLAG_PREDICTED
+
+    header = HEADER.pack(
+        VERSION,
+        GESTURE_IDS[gesturekey],
+        GESTURE_IDS[payload.get("action", gesturekey)],
+        hand_id,
+        flags,
+        source or 0,
+        PHASE_IDS[phase or ""],
+        timestamp,
+        payload.get("x", 0.0),
+        payload.get("y", 0.0),
+        payload.get("current_dist", 0.0),
+    )
+    parts = [header]
+    if flags & FLAG_PREDICTED:
+        parts.append(PREDICTED.pack(payload["px"], payload["py"]))
+    if landmarks is not None:
+        parts.append(np.ascontiguousarray(landmarks, dtype="<f4").tobytes())
+    return b"".join(parts) if len(parts) > 1 else header
+
+
+def decode_gesture(data):
+    """-> (json 경로와 같은 모양의 메시지 dict, timestamp, hand_id, landmarks 또는 None)"""
+    version, key, action, hand_id, flags, source, phase, timestamp, x, y, dist = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"unsupported wire format version {version}")
+
+    payload = {"action": GESTURES[action]}
+    if flags & FLAG_POSITION:
+        payload["x"] = x
+        payload["y"] = y
+    if flags & FLAG_DIST:
+        payload["current_dist"] = dist
+    if flags & FLAG_SOURCE:
+        payload["source"] = source
+    if flags & FLAG_PHASE:
+        payload["phase"] = PHASES[phase]
+
+    offset = HEADER.size
+    if flags & FLAG_PREDICTED:
+        payload["px"], payload["py"] = PREDICTED.unpack_from(data, offset)
+        offset += PREDICTED.size
+
+    landmarks = None
+    if flags & FLAG_LANDMARKS:
+        landmarks = np.frombuffer(data, dtype="<f4", count=21 * 3, offset=offset).reshape(LANDMARK_SHAPE)
+
+    return {GESTURES[key]: payload}, timestamp, hand_id, landmarks
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# wire_format 바이너리 프레임이 JSON 경로와 같은 값을 전달하는지 확인한다 (mediapipe / cv2 없이 실행)
+#   python -m pytest -q wire_format_test.py
+import json
+
+import numpy as np
+import pytest
+
+from gesture_engine import GestureEvent
+from wire_format import (FLAG_LANDMARKS, GESTURE_IDS, GESTURES, HAND_IDS, HAND_LEFT, HAND_NONE, HEADER, PHASES,
+                         decode_gesture, encode_gesture)
+
+LANDMARKS = (np.arange(21 * 3, dtype=np.float32).reshape(21, 3) / 64).astype(np.float32)
+
+# GestureFrame.java / index.html decodeGestureFrame 의 기준 프레임. 레이아웃을 바꾸면 세 곳을 같이 고칠 것
+#   left_pinch / action pinch / Left / flags position|dist|source|phase|predicted / source 2 / phase end
+#   timestamp 1700000000.25, x 0.25, y 0.75, current_dist 0.125, px 0.5, py -0.5
+GOLDEN = bytes.fromhex(
+    "010402013b020300"
+    "00001040fc54d941"
+    "0000803e0000403f0000003e"
+    "0000003f000000bf"
+)
+GOLDEN_MESSAGE = {"left_pinch": {"action": "pinch", "x": 0.25, "y": 0.75, "current_dist": 0.125, "source": 2,
+                                 "phase": "end", "px": 0.5, "py": -0.5}}
+
+
+def _events():
+    for gesture in GESTURES:
+        for phase in PHASES:
+            yield GestureEvent(gesture, {"action": gesture}, 1700000000.125, phase=phase or None)
+            yield GestureEvent(gesture, {"action": gesture, "x": 0.31415, "y": 0.27182, "current_dist": 0.0123},
+                               1700000000.5, hand="Right", points=LANDMARKS, source=1, phase=phase or None)
+            yield GestureEvent(gesture, {"action": gesture, "x": 0.5, "y": 0.25, "px": 0.52341, "py": 0.24567},
+                               1700000001.0, hand="Left", points=LANDMARKS, phase=phase or None)
+
+
+def _assert_same(decoded, expected):
+    assert decoded.keys() == expected.keys()
+    for key, payload in expected.items():
+        assert decoded[key].keys() == payload.keys()
+        for field, value in payload.items():
+            if isinstance(value, float):
+                # x / y / current_dist / px / py 는 float32 로 보낸다
+                assert decoded[key][field] == pytest.approx(value, rel=1e-6, abs=1e-7), field
+            else:
+                assert decoded[key][field] == value, field
+
+
+@pytest.mark.parametrize("event", list(_events()), ids=repr)
+def test_binary_matches_json(event):
+    expected = json.loads(event.to_json())
+    message, timestamp, hand_id, landmarks = decode_gesture(event.encode(binary=True))
+
+    _assert_same(message, expected)
+    assert timestamp == event.timestamp
+    assert hand_id == HAND_IDS.get(event.hand, HAND_NONE)
+    assert landmarks is None
+
+
+@pytest.mark.parametrize("gesture", GESTURES)
+def test_landmark_block(gesture):
+    event = GestureEvent(gesture, {"action": gesture, "x": 0.1, "y": 0.2}, 12.5, hand="Right", points=LANDMARKS,
+                         phase="update")
+    data = event.encode(include_landmarks=True)
+    message, _, _, landmarks = decode_gesture(data)
+
+    assert data[4] & FLAG_LANDMARKS
+    assert len(data) == HEADER.size + 21 * 3 * 4
+    _assert_same(message, json.loads(event.to_json()))
+    assert landmarks.dtype == np.float32
+    np.testing.assert_array_equal(landmarks, LANDMARKS)
+
+
+def test_golden_frame():
+    data = encode_gesture("left_pinch", {"action": "pinch", "x": 0.25, "y": 0.75, "current_dist": 0.125,
+                                         "px": 0.5, "py": -0.5},
+                          1700000000.25, HAND_LEFT, source=2, phase="end")
+    assert data == GOLDEN
+
+    message, timestamp, hand_id, landmarks = decode_gesture(GOLDEN)
+    assert message == GOLDEN_MESSAGE
+    assert timestamp == 1700000000.25
+    assert hand_id == HAND_LEFT
+    assert landmarks is None
+
+
+def test_gesture_ids_are_stable():
+    # 디코더들이 번호로 제스처를 찾으므로 기존 번호는 바뀌면 안 된다
+    assert GESTURES[:8] == ("none", "pointer", "pinch", "pinch_zoom", "left_pinch", "drag", "expansion_zoom",
+                            "rotate")
+    assert all(GESTURE_IDS[name] == i for i, name in enumerate(GESTURES))
+
+
+def test_unknown_version_rejected():
+    with pytest.raises(ValueError):
+        decode_gesture(b"\x02" + GOLDEN[1:])
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import collections
+import random
+import threading
+import time
+
+import websocket
+
+
+class WebSocketSender:
+    """백그라운드 스레드에서 websocket 연결/전송/재연결을 담당한다.
+
+    send() 는 절대 블로킹하지 않는다. 제스처 키마다 가장 최신 메시지 하나만
+    대기열에 두고, 전송 전에 새 메시지가 오면 덮어쓴다 (coalesced).
+    """
+
+    def __init__(self, url="ws://localhost:8884", backoff_min=0.1, backoff_max=5.0,
+                 connect_timeout=2.0, max_age=1.0, metrics=None, ping_interval=None, ping_timeout=1.0):
+        self.url = url
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self.max_age = max_age  # 이보다 오래 기다린 메시지는 버림
+        self.metrics = metrics  # capture_to_send_seconds 기록용 (metrics.Metrics)
+        # ping_interval 초마다 ping 을 보내 ping_timeout 안에 pong 이 없으면 끊고 다시 연결 (None 이면 끔).
+        # 보내기는 성공해도 응답하지 않는 중계 서버를 찾아낸다
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.rtt = None  # 마지막 ping 왕복 시간 (초)
+
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "reconnects": 0, "errors": 0, "ping_failures": 0}
+        self.connected = False
+        self._ever_connected = False
+
+        self._pending = collections.OrderedDict()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+        self._last_ping = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ws-sender", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._close()
+
+    def send(self, data, key=None, captured_at=None):
+        """captured_at: 프레임 캡처 시각 (time.time()). 없으면 큐에 넣은 시각"""
+        with self._cond:
+            if key in self._pending:
+                del self._pending[key]
+                self.stats["coalesced"] += 1
+            self._pending[key] = (captured_at or time.time(), data)
+            self._cond.notify()
+
+    @property
+    def backlog(self):
+        """아직 보내지 못한 메시지 수 (키마다 하나)"""
+        return len(self._pending)
+
+    def drain(self):
+        """보내지 못한 메시지를 모두 꺼낸다 -> [(key, captured_at, data), ...] (다른 연결로 넘길 때)"""
+        with self._cond:
+            items = [(key, queued_at, data) for key, (queued_at, data) in self._pending.items()]
+            self._pending.clear()
+        return items
+
+    def summary(self):
+        s = self.stats
+        return (f"[ws] sent={s['sent']} dropped={s['dropped']} coalesced={s['coalesced']} "
+                f"reconnects={s['reconnects']} errors={s['errors']}")
+
+    def _connect(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                self._ws = websocket.create_connection(self.url, timeout=self.connect_timeout)
+                if self._ever_connected:
+                    self.stats["reconnects"] += 1
+                self._ever_connected = True
+                self.connected = True
+                print(f"✓ WebSocket Connected ({self.url})")
+                return True
+            except Exception as e:
+                delay = min(self.backoff_max, self.backoff_min * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.0)
+                if attempt == 0:
+                    print(f"✗ Connection error: {e}. Retrying...")
+                attempt += 1
+                self._stop.wait(delay)
+        return False
+
+    def _close(self):
+        self.connected = False
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+            self._ws = None
+
+    def _ping(self):
+        """ping 을 보내고 pong 을 기다린다. 중계 서버가 broadcast 로 보낸 메시지는 읽어서 버린다."""
+        self._last_ping = time.time()
+        try:
+            self._ws.ping()
+            self._ws.settimeout(self.ping_timeout)
+            while True:
+                opcode, _ = self._ws.recv_data(control_frame=True)
+                if opcode == websocket.ABNF.OPCODE_PONG:
+                    break
+                if time.time() - self._last_ping > self.ping_timeout:
+                    raise websocket.WebSocketTimeoutException("no pong")
+            self._ws.settimeout(self.connect_timeout)
+            self.rtt = time.time() - self._last_ping
+            return True
+        except Exception as e:
+            print(f"✗ health check failed ({self.url}): {e}")
+            self.stats["ping_failures"] += 1
+            self._close()
+            return False
+
+    def _next(self):
+        with self._cond:
+            if not self._pending and not self._stop.is_set():
+                self._cond.wait(min(0.5, self.ping_interval or 0.5))
+            if not self._pending:
+                return None
+            return self._pending.popitem(last=False)
+
+    def _requeue(self, key, item):
+        with self._cond:
+            if key in self._pending:
+                self.stats["dropped"] += 1
+            else:
+                self._pending[key] = item
+                self._pending.move_to_end(key, last=False)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.connected and not self._connect():
+                break
+            if self.ping_interval and time.time() - self._last_ping >= self.ping_interval and not self._ping():
+                continue
+
+            entry = self._next()
+            if entry is None:
+                continue
+            key, item = entry
+            queued_at, data = item
+
+            if self.max_age and time.time() - queued_at > self.max_age:
+                self.stats["dropped"] += 1
+                continue
+
+            try:
+                if isinstance(data, bytes):
+                    self._ws.send_binary(data)
+                else:
+                    self._ws.send(data)
+                self.stats["sent"] += 1
+                if self.metrics is not None:
+                    self.metrics.observe("capture_to_send_seconds", time.time() - queued_at)
+            except Exception as e:
+                print(f"\n✗ send err: {e}")
+                print("→ reconnection trying")
+                self.stats["errors"] += 1
+                self._close()
+                self._requeue(key, item)
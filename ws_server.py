@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import collections
+import json
+import logging
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+log = logging.getLogger("gesture_hud")
+
+FORMATS = ("json", "binary", "binary_landmarks")
+
+
+class Subscriber:
+    """연결 하나의 구독 설정과 대기열.
+
+    - format: json / binary / binary_landmarks
+    - rate: 초당 최대 전송 횟수 (0 이면 제한 없음)
+    - gestures: 받을 제스처 키 집합 (비어 있으면 전부)
+    - landmarks: 1 이면 21개 랜드마크 스트림 (landmark_stream.py) 도 받는다
+
+    대기열은 coalesce 키마다 최신 이벤트 하나만 두므로 느린 클라이언트는
+    밀린 이벤트 대신 최신 값만 받는다.
+    """
+
+    def __init__(self, ws, name):
+        self.ws = ws
+        self.name = name
+        self.format = "json"
+        self.rate = 0.0
+        self.gestures = set()
+        self.landmarks = False
+        self.pending = collections.OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.last_flush = 0.0
+        self.sent = 0
+        self.coalesced = 0
+
+    def configure(self, options):
+        fmt = options.get("format", self.format)
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        self.format = fmt
+        self.rate = float(options.get("rate", self.rate))
+        gestures = options.get("gestures", self.gestures)
+        if isinstance(gestures, str):
+            gestures = [g for g in gestures.split(",") if g]
+        self.gestures = set(gestures)
+        landmarks = options.get("landmarks", self.landmarks)
+        self.landmarks = landmarks in (True, 1, "1", "true")
+
+    def offer(self, event):
+        """대기 중이던 같은 키의 이벤트를 덮어썼으면 True"""
+        if self.gestures and event.key not in self.gestures:
+            return False
+        return self._queue(event.coalesce_key, event)
+
+    def offer_landmarks(self, key, data):
+        if not self.landmarks:
+            return False
+        return self._queue(key, data)
+
+    def _queue(self, key, event):
+        coalesced = key in self.pending
+        if coalesced:
+            del self.pending[key]
+            self.coalesced += 1
+        self.pending[key] = event
+        self.wakeup.set()
+        return coalesced
+
+    def encode(self, event):
+        if isinstance(event, bytes):  # 랜드마크 스트림은 이미 인코딩돼 있다
+            return event
+        if self.format == "json":
+            return event.to_json()
+        return event.to_binary(self.format == "binary_landmarks")
+
+
+class GestureServer:
+    """트래커 프로세스 안에서 바로 여는 asyncio websocket 서버 (중계 서버 없이 구독).
+
+    연결 URL 의 query string 으로 구독을 정한다:
+        ws://host:port/?format=binary&rate=30&gestures=pointer,pinch
+    연결 후 같은 키를 가진 JSON 메시지를 보내면 설정을 바꾼다.
+
+    publish() 는 트래킹 스레드에서 호출하며 블로킹하지 않는다.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8885, metrics=None):
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.subscribers = set()
+        self.stats = {"published": 0, "sent": 0, "coalesced": 0, "connections": 0}
+
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._server = None
+        self._seq = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ws-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        print(f"[Server] ws://localhost:{self.port}/?format=json|binary|binary_landmarks&rate=N&gestures=a,b&landmarks=1")
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+
+    def publish(self, event):
+        if self._loop is None or not self.subscribers:
+            return
+        self.stats["published"] += 1
+        self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def publish_landmarks(self, key, data):
+        """landmark_stream 프레임 (bytes) 을 landmarks=1 구독자에게. key 는 coalesce 키"""
+        if self._loop is None or not self.subscribers:
+            return
+        self._loop.call_soon_threadsafe(self._dispatch_landmarks, key, data)
+
+    def summary(self):
+        s = self.stats
+        return (f"[server] subscribers={len(self.subscribers)} published={s['published']} sent={s['sent']} "
+                f"coalesced={s['coalesced']}")
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(self._serve())
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._close())
+            self._loop.close()
+
+    async def _serve(self):
+        import websockets
+
+        return await websockets.serve(self._handler, self.host, self.port)
+
+    async def _close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _dispatch(self, event):
+        for subscriber in self.subscribers:
+            if subscriber.offer(event):
+                self.stats["coalesced"] += 1
+
+    def _dispatch_landmarks(self, key, data):
+        for subscriber in self.subscribers:
+            if subscriber.offer_landmarks(key, data):
+                self.stats["coalesced"] += 1
+
+    async def _handler(self, ws, path=None):
+        if path is None:
+            path = ws.request.path
+        self._seq += 1
+        subscriber = Subscriber(ws, f"client-{self._seq}")
+        try:
+            subscriber.configure({k: v[-1] for k, v in parse_qs(urlsplit(path).query).items()})
+        except ValueError as e:
+            await ws.close(1008, str(e))
+            return
+
+        self.subscribers.add(subscriber)
+        self.stats["connections"] += 1
+        log.info("✓ %s subscribed (format=%s rate=%s gestures=%s landmarks=%s)", subscriber.name, subscriber.format,
+                 subscriber.rate or "unlimited", ",".join(sorted(subscriber.gestures)) or "all", subscriber.landmarks)
+
+        writer = asyncio.ensure_future(self._writer(subscriber))
+        try:
+            async for message in ws:
+                # 연결 중 설정 변경
+                try:
+                    subscriber.configure(json.loads(message))
+                except (ValueError, TypeError, AttributeError) as e:
+                    log.warning("%s: bad subscription message (%s)", subscriber.name, e)
+        except Exception:
+            pass
+        finally:
+            writer.cancel()
+            self.subscribers.discard(subscriber)
+            log.info("%s disconnected (sent=%d coalesced=%d)", subscriber.name, subscriber.sent, subscriber.coalesced)
+
+    async def _writer(self, subscriber):
+        loop = asyncio.get_running_loop()
+        while True:
+            await subscriber.wakeup.wait()
+            if subscriber.rate > 0:
+                delay = subscriber.last_flush + 1.0 / subscriber.rate - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            subscriber.wakeup.clear()
+            subscriber.last_flush = loop.time()
+
+            # 전송(await) 중에 들어온 이벤트는 같은 키의 대기 이벤트를 덮어쓴다
+            while subscriber.pending:
+                _, event = subscriber.pending.popitem(last=False)
+                try:
+                    data = subscriber.encode(event)
+                except Exception as e:
+                    # 인코딩할 수 없는 이벤트 하나 때문에 이 구독자의 writer 가 끝나지 않도록 건너뛴다
+                    log.warning("%s: dropping %r (%s)", subscriber.name, event, e)
+                    continue
+                await subscriber.ws.send(data)
+                subscriber.sent += 1
+                self.stats["sent"] += 1
+                if self.metrics is not None:
+                    self.metrics.inc("server_sent_total", labels=(("format", subscriber.format),))